@@ -1,21 +1,57 @@
 import os
 from collections.abc import Generator
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
+from sqlalchemy.pool import StaticPool
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./ims_independent.db")
 
 connect_args: dict[str, object] = {}
+engine_options: dict[str, object] = {}
 if DATABASE_URL.startswith("sqlite"):
     connect_args["check_same_thread"] = False
-
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    if make_url(DATABASE_URL).database in (None, "", ":memory:"):
+        # An in-memory database lives and dies with its connection, so every session shares one.
+        engine_options["poolclass"] = StaticPool
+else:
+    # Server databases: size the pool for concurrent requests and drop stale connections.
+    engine_options.update(
+        pool_size=int(os.getenv("DB_POOL_SIZE", "20")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "40")),
+        pool_pre_ping=True,
+        pool_recycle=1800,
+        # Fail fast when the pool is exhausted instead of queueing requests behind it.
+        pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "10")),
+    )
+    if DATABASE_URL.startswith("postgresql"):
+        # READ COMMITTED is the Postgres default, pinned so a server-side change cannot alter it.
+        engine_options["isolation_level"] = "READ COMMITTED"
+        connect_args["options"] = f"-c statement_timeout={int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '10000'))}"
+
+engine = create_engine(DATABASE_URL, connect_args=connect_args, **engine_options)
+SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)
+
+
+if engine.dialect.name == "sqlite":
+
+    @event.listens_for(engine, "connect")
+    def _configure_sqlite_connection(dbapi_connection, _connection_record) -> None:
+        # WAL lets readers (auth lookups, dashboard) proceed while a write is in flight.
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        # NORMAL is durable across application crashes under WAL and avoids an fsync per commit.
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.close()
 
 
 class Base(DeclarativeBase):
-    pass
+    # Fetch database-generated defaults (timestamps) in the INSERT/UPDATE via RETURNING
+    # instead of expiring them and lazy-loading on first access.
+    __mapper_args__ = {"eager_defaults": True}
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -1,28 +1,43 @@
 from __future__ import annotations
 
-import json
+import threading
+import time
+from collections.abc import Sequence
 from contextlib import asynccontextmanager
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 
 from fastapi import Depends, FastAPI, HTTPException, Query, Request, status
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from sqlalchemy import Select, func, select
+from sqlalchemy import ColumnElement, Row, Select, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import flag_modified
 
 from app.auth import Principal, ensure_auth_config, require_roles, verify_password
 from app.database import Base, engine, get_db
 from app.models import (
+    INVENTORY_TOTALS_ID,
     AuditLog,
+    InventoryTotals,
     Item,
     ItemStatus,
     QuantityEvent,
     QuantityEventType,
     UserAccount,
     UserRole,
+    dump_audit_state,
+    ensure_enum_values_stored,
+    ensure_inventory_totals,
+    ensure_item_search_index,
+    inventory_totals_aggregate,
+    inventory_totals_maintained,
+    item_search,
 )
 from app.schemas import (
+    AiInsightsResponse,
     AnomalyAlertResponse,
     AuditLogRead,
     BulkStatusUpdateRequest,
@@ -40,10 +55,12 @@ from app.schemas import (
     NaturalLanguageSearchResponse,
     QuantityAdjustmentRequest,
     ReorderSuggestionResponse,
+    USER_READ_LIST_ADAPTER,
     UserRead,
     UserRoleUpdate,
 )
 from app.services.ai_features import (
+    build_ai_insights,
     build_anomaly_alerts,
     build_reorder_suggestions,
     parse_natural_language_filters,
@@ -54,6 +71,10 @@ from app.services.ai_features import (
 async def lifespan(_: FastAPI):
     ensure_auth_config()
     Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        ensure_enum_values_stored(connection)
+        ensure_item_search_index(connection)
+        ensure_inventory_totals(connection)
     yield
 
 
@@ -62,11 +83,20 @@ app = FastAPI(
     version="2.0.0",
     description="Inventory system with RBAC, search, audit trails, and AI-powered planning.",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 templates = Jinja2Templates(directory="app/templates")
 
+READ_ACCESS = require_roles(UserRole.ADMIN, UserRole.MANAGER, UserRole.VIEWER)
+WRITE_ACCESS = require_roles(UserRole.ADMIN, UserRole.MANAGER)
+ADMIN_ACCESS = require_roles(UserRole.ADMIN)
+
+# Plain dict lookups for the enum values written into snapshots and audit notes.
+_STATUS_VALUE = {member: member.value for member in ItemStatus}
+_ROLE_VALUE = {member: member.value for member in UserRole}
+
 
 def _item_snapshot(item: Item) -> dict[str, object]:
     return {
@@ -78,40 +108,23 @@ def _item_snapshot(item: Item) -> dict[str, object]:
         "quantity": item.quantity,
         "reorder_threshold": item.reorder_threshold,
         "unit_cost": item.unit_cost,
-        "status": item.status.value,
+        "status": _STATUS_VALUE[item.status],
         "is_deleted": item.is_deleted,
         "updated_at": item.updated_at.isoformat() if item.updated_at else None,
     }
 
 
-def _serialize_item(item: Item) -> ItemRead:
-    return ItemRead(
-        id=item.id,
-        sku=item.sku,
-        name=item.name,
-        category=item.category,
-        details=item.details,
-        quantity=item.quantity,
-        reorder_threshold=item.reorder_threshold,
-        unit_cost=item.unit_cost,
-        status=item.status,
-        is_deleted=item.is_deleted,
-        created_at=item.created_at,
-        updated_at=item.updated_at,
-    )
-
-
-def _derive_stock_status(item: Item, keep_ordered: bool = True) -> ItemStatus:
-    if item.status == ItemStatus.DISCONTINUED:
-        return ItemStatus.DISCONTINUED
-
-    if keep_ordered and item.status == ItemStatus.ORDERED and item.quantity <= item.reorder_threshold:
-        return ItemStatus.ORDERED
-
-    if item.quantity <= item.reorder_threshold:
-        return ItemStatus.LOW_STOCK
-
-    return ItemStatus.IN_STOCK
+def _updated_snapshot(before: dict[str, object], item: Item, *fields: str) -> dict[str, object]:
+    """Copy ``before`` and re-read only the fields a mutation touched."""
+    after = dict(before)
+    for field in fields:
+        value = getattr(item, field)
+        if field == "status":
+            value = _STATUS_VALUE[value]
+        elif field == "updated_at":
+            value = value.isoformat() if value else None
+        after[field] = value
+    return after
 
 
 def _get_item_or_404(db: Session, item_id: int) -> Item:
@@ -121,6 +134,37 @@ def _get_item_or_404(db: Session, item_id: int) -> Item:
     return item
 
 
+def _flush_item_write(db: Session, sku: str) -> None:
+    # The unique index on items.sku is the source of truth; no pre-check SELECT.
+    try:
+        db.flush()
+    except IntegrityError as exc:
+        db.rollback()
+        if "sku" in str(exc.orig):
+            raise HTTPException(status_code=409, detail=f"SKU already exists: {sku}") from exc
+        raise
+
+
+def _audit_log_values(
+    actor_user_id: int | None,
+    entity_type: str,
+    entity_id: int | None,
+    action: str,
+    before_state: dict[str, object] | None = None,
+    after_state: dict[str, object] | None = None,
+    note: str | None = None,
+) -> dict[str, object]:
+    return {
+        "actor_user_id": actor_user_id,
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "action": action,
+        "before_state": dump_audit_state(before_state),
+        "after_state": dump_audit_state(after_state),
+        "note": note,
+    }
+
+
 def _create_audit_log(
     db: Session,
     actor_user_id: int | None,
@@ -131,16 +175,32 @@ def _create_audit_log(
     after_state: dict[str, object] | None = None,
     note: str | None = None,
 ) -> None:
-    log = AuditLog(
-        actor_user_id=actor_user_id,
-        entity_type=entity_type,
-        entity_id=entity_id,
-        action=action,
-        before_state=json.dumps(before_state) if before_state is not None else None,
-        after_state=json.dumps(after_state) if after_state is not None else None,
-        note=note,
+    db.add(
+        AuditLog(
+            **_audit_log_values(actor_user_id, entity_type, entity_id, action, before_state, after_state, note)
+        )
+    )
+
+
+# Only the columns the read models expose; list paths build responses straight from these rows.
+_ITEM_READ_COLUMNS = tuple(getattr(Item, field) for field in ItemRead.model_fields)
+_AUDIT_READ_COLUMNS = tuple(getattr(AuditLog, field) for field in AuditLogRead.model_fields)
+
+
+def _item_search_clause(term: str) -> ColumnElement[bool]:
+    # The trigram tokenizer can only match terms of three or more characters.
+    if engine.dialect.name == "sqlite" and len(term) >= 3:
+        phrase = '"' + term.replace('"', '""') + '"'
+        matches = select(item_search.c.rowid).where(item_search.c.items_fts.match(phrase))
+        return Item.id.in_(matches)
+
+    token = f"%{term}%"
+    return (
+        Item.name.ilike(token)
+        | Item.sku.ilike(token)
+        | Item.category.ilike(token)
+        | Item.details.ilike(token)
     )
-    db.add(log)
 
 
 def _build_item_filter_query(
@@ -157,16 +217,10 @@ def _build_item_filter_query(
         stmt = stmt.where(Item.is_deleted.is_(False))
 
     if q:
-        token = f"%{q.strip()}%"
-        stmt = stmt.where(
-            Item.name.ilike(token)
-            | Item.sku.ilike(token)
-            | Item.category.ilike(token)
-            | Item.details.ilike(token)
-        )
+        stmt = stmt.where(_item_search_clause(q.strip()))
 
     if category:
-        stmt = stmt.where(Item.category.ilike(category.strip()))
+        stmt = stmt.where(func.lower(Item.category) == category.strip().lower())
 
     if status_filter is not None:
         stmt = stmt.where(Item.status == status_filter)
@@ -196,6 +250,58 @@ def _apply_sort(stmt: Select[tuple[Item]], sort_by: str, sort_dir: str) -> Selec
     return stmt.order_by(column.desc())
 
 
+@lru_cache(maxsize=256)
+def _natural_language_search_stmt(
+    q: str,
+    category: str | None,
+    status_filter: ItemStatus | None,
+    min_qty: int | None,
+    max_qty: int | None,
+    sort_by: str,
+    sort_dir: str,
+) -> Select:
+    # Repeated queries reuse the built statement, which also keeps SQLAlchemy's compiled cache warm.
+    stmt = _build_item_filter_query(q, category, status_filter, min_qty, max_qty, include_deleted=False)
+    stmt = _apply_sort(stmt.with_only_columns(*_ITEM_READ_COLUMNS), sort_by=sort_by, sort_dir=sort_dir)
+    return stmt.limit(100)
+
+
+def _list_items_impl(
+    db: Session,
+    q: str | None,
+    category: str | None,
+    status_filter: ItemStatus | None,
+    min_qty: int | None,
+    max_qty: int | None,
+    include_deleted: bool,
+    sort_by: str,
+    sort_dir: str,
+    page: int,
+    page_size: int,
+) -> ItemListResponse:
+    filtered = _build_item_filter_query(q, category, status_filter, min_qty, max_qty, include_deleted)
+
+    # The window count is evaluated before LIMIT, so one query yields both the page and the total.
+    stmt = _apply_sort(filtered.with_only_columns(*_ITEM_READ_COLUMNS), sort_by=sort_by, sort_dir=sort_dir)
+    stmt = stmt.add_columns(func.count().over().label("total"))
+    stmt = stmt.offset((page - 1) * page_size).limit(page_size)
+
+    rows = db.execute(stmt).all()
+    if rows:
+        total = int(rows[0].total)
+    elif page > 1:
+        total = int(db.scalar(select(func.count()).select_from(filtered.subquery())) or 0)
+    else:
+        total = 0
+
+    return ItemListResponse(
+        items=[ItemRead.from_row(row) for row in rows],
+        total=total,
+        page=page,
+        page_size=page_size,
+    )
+
+
 @app.get("/", response_class=HTMLResponse)
 def home(request: Request) -> HTMLResponse:
     return templates.TemplateResponse("index.html", {"request": request})
@@ -217,7 +323,7 @@ def login(payload: LoginRequest, db: Session = Depends(get_db)) -> LoginResponse
 
 @app.get("/api/me", response_model=UserRead)
 def me(
-    principal: Principal = Depends(require_roles(UserRole.ADMIN, UserRole.MANAGER, UserRole.VIEWER)),
+    principal: Principal = Depends(READ_ACCESS),
     db: Session = Depends(get_db),
 ) -> UserRead:
     user = db.get(UserAccount, principal.user_id)
@@ -228,18 +334,18 @@ def me(
 
 @app.get("/api/users", response_model=list[UserRead])
 def list_users(
-    _: Principal = Depends(require_roles(UserRole.ADMIN)),
+    _: Principal = Depends(ADMIN_ACCESS),
     db: Session = Depends(get_db),
 ) -> list[UserRead]:
     users = db.scalars(select(UserAccount).order_by(UserAccount.username.asc())).all()
-    return [UserRead.model_validate(user) for user in users]
+    return USER_READ_LIST_ADAPTER.validate_python(users, from_attributes=True)
 
 
 @app.patch("/api/users/{user_id}/role", response_model=UserRead)
 def update_user_role(
     user_id: int,
     payload: UserRoleUpdate,
-    principal: Principal = Depends(require_roles(UserRole.ADMIN)),
+    principal: Principal = Depends(ADMIN_ACCESS),
     db: Session = Depends(get_db),
 ) -> UserRead:
     user = db.get(UserAccount, user_id)
@@ -249,7 +355,7 @@ def update_user_role(
     before = {
         "id": user.id,
         "username": user.username,
-        "role": user.role.value,
+        "role": _ROLE_VALUE[user.role],
         "is_active": user.is_active,
     }
     user.role = payload.role
@@ -263,24 +369,19 @@ def update_user_role(
         entity_id=user.id,
         action="USER_ROLE_UPDATE",
         before_state=before,
-        after_state={"id": user.id, "username": user.username, "role": user.role.value},
-        note=f"Role changed to {user.role.value}",
+        after_state={"id": user.id, "username": user.username, "role": _ROLE_VALUE[user.role]},
+        note=f"Role changed to {_ROLE_VALUE[user.role]}",
     )
     db.commit()
-    db.refresh(user)
     return UserRead.model_validate(user)
 
 
 @app.post("/api/items", response_model=ItemRead)
 def create_item(
     payload: ItemCreate,
-    principal: Principal = Depends(require_roles(UserRole.ADMIN, UserRole.MANAGER)),
+    principal: Principal = Depends(WRITE_ACCESS),
     db: Session = Depends(get_db),
 ) -> ItemRead:
-    existing = db.scalar(select(Item).where(Item.sku == payload.sku))
-    if existing:
-        raise HTTPException(status_code=409, detail=f"SKU already exists: {payload.sku}")
-
     item = Item(
         sku=payload.sku,
         name=payload.name,
@@ -289,17 +390,15 @@ def create_item(
         quantity=payload.quantity,
         reorder_threshold=payload.reorder_threshold,
         unit_cost=payload.unit_cost,
-        status=payload.status or ItemStatus.IN_STOCK,
+        # Left unset, the status is derived from the stock levels on insert.
+        status=payload.status,
         is_deleted=(payload.status == ItemStatus.DISCONTINUED),
         created_by_id=principal.user_id,
         updated_by_id=principal.user_id,
     )
 
-    if payload.status is None:
-        item.status = _derive_stock_status(item, keep_ordered=False)
-
     db.add(item)
-    db.flush()
+    _flush_item_write(db, item.sku)
 
     _create_audit_log(
         db,
@@ -312,8 +411,7 @@ def create_item(
     )
 
     db.commit()
-    db.refresh(item)
-    return _serialize_item(item)
+    return ItemRead.from_row(item)
 
 
 @app.get("/api/items", response_model=ItemListResponse)
@@ -328,19 +426,19 @@ def list_items(
     sort_dir: str = Query(default="desc"),
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=25, ge=1, le=200),
-    _: Principal = Depends(require_roles(UserRole.ADMIN, UserRole.MANAGER, UserRole.VIEWER)),
+    _: Principal = Depends(READ_ACCESS),
     db: Session = Depends(get_db),
 ) -> ItemListResponse:
-    stmt = _build_item_filter_query(q, category, status_filter, min_qty, max_qty, include_deleted)
-    total = int(db.scalar(select(func.count()).select_from(stmt.subquery())) or 0)
-
-    stmt = _apply_sort(stmt, sort_by=sort_by, sort_dir=sort_dir)
-    stmt = stmt.offset((page - 1) * page_size).limit(page_size)
-
-    items = db.scalars(stmt).all()
-    return ItemListResponse(
-        items=[_serialize_item(item) for item in items],
-        total=total,
+    return _list_items_impl(
+        db,
+        q=q,
+        category=category,
+        status_filter=status_filter,
+        min_qty=min_qty,
+        max_qty=max_qty,
+        include_deleted=include_deleted,
+        sort_by=sort_by,
+        sort_dir=sort_dir,
         page=page,
         page_size=page_size,
     )
@@ -355,10 +453,11 @@ def search_items(
     max_qty: int | None = Query(default=None, ge=0),
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=25, ge=1, le=200),
-    principal: Principal = Depends(require_roles(UserRole.ADMIN, UserRole.MANAGER, UserRole.VIEWER)),
+    _: Principal = Depends(READ_ACCESS),
     db: Session = Depends(get_db),
 ) -> ItemListResponse:
-    return list_items(
+    return _list_items_impl(
+        db,
         q=q,
         category=category,
         status_filter=status_filter,
@@ -369,25 +468,23 @@ def search_items(
         sort_dir="desc",
         page=page,
         page_size=page_size,
-        _=principal,
-        db=db,
     )
 
 
 @app.get("/api/items/{item_id}", response_model=ItemRead)
 def get_item(
     item_id: int,
-    _: Principal = Depends(require_roles(UserRole.ADMIN, UserRole.MANAGER, UserRole.VIEWER)),
+    _: Principal = Depends(READ_ACCESS),
     db: Session = Depends(get_db),
 ) -> ItemRead:
-    return _serialize_item(_get_item_or_404(db, item_id))
+    return ItemRead.from_row(_get_item_or_404(db, item_id))
 
 
 @app.put("/api/items/{item_id}", response_model=ItemRead)
 def update_item(
     item_id: int,
     payload: ItemUpdate,
-    principal: Principal = Depends(require_roles(UserRole.ADMIN, UserRole.MANAGER)),
+    principal: Principal = Depends(WRITE_ACCESS),
     db: Session = Depends(get_db),
 ) -> ItemRead:
     item = _get_item_or_404(db, item_id)
@@ -399,21 +496,18 @@ def update_item(
     before = _item_snapshot(item)
 
     updates = payload.model_dump(exclude_unset=True)
-    if "sku" in updates:
-        sku_conflict = db.scalar(select(Item).where(Item.sku == updates["sku"], Item.id != item.id))
-        if sku_conflict:
-            raise HTTPException(status_code=409, detail=f"SKU already exists: {updates['sku']}")
-
+    # A null status means "not set": it is left to the flush-time derivation rather than written.
+    if updates.get("status", ...) is None:
+        del updates["status"]
     previous_qty = item.quantity
-    explicit_status = "status" in updates and updates["status"] is not None
+    explicit_status = "status" in updates
 
     for key, value in updates.items():
         setattr(item, key, value)
 
     if explicit_status:
+        flag_modified(item, "status")
         item.is_deleted = item.status == ItemStatus.DISCONTINUED
-    else:
-        item.status = _derive_stock_status(item)
 
     if item.quantity != previous_qty:
         delta = item.quantity - previous_qty
@@ -432,6 +526,8 @@ def update_item(
     item.updated_at = datetime.now(timezone.utc)
 
     db.add(item)
+    # Flushing applies the derived status before it is snapshotted.
+    _flush_item_write(db, item.sku)
     _create_audit_log(
         db,
         actor_user_id=principal.user_id,
@@ -439,18 +535,17 @@ def update_item(
         entity_id=item.id,
         action="ITEM_UPDATE",
         before_state=before,
-        after_state=_item_snapshot(item),
+        after_state=_updated_snapshot(before, item, *updates, "status", "is_deleted", "updated_at"),
     )
 
     db.commit()
-    db.refresh(item)
-    return _serialize_item(item)
+    return ItemRead.from_row(item)
 
 
 @app.delete("/api/items/{item_id}")
 def delete_item(
     item_id: int,
-    principal: Principal = Depends(require_roles(UserRole.ADMIN, UserRole.MANAGER)),
+    principal: Principal = Depends(WRITE_ACCESS),
     db: Session = Depends(get_db),
 ) -> dict[str, object]:
     item = _get_item_or_404(db, item_id)
@@ -460,6 +555,7 @@ def delete_item(
     before = _item_snapshot(item)
     item.is_deleted = True
     item.status = ItemStatus.DISCONTINUED
+    flag_modified(item, "status")
     item.updated_by_id = principal.user_id
     item.updated_at = datetime.now(timezone.utc)
 
@@ -471,7 +567,7 @@ def delete_item(
         entity_id=item.id,
         action="ITEM_DELETE",
         before_state=before,
-        after_state=_item_snapshot(item),
+        after_state=_updated_snapshot(before, item, "status", "is_deleted", "updated_at"),
         note="Soft delete",
     )
 
@@ -483,13 +579,14 @@ def delete_item(
 def update_item_status(
     item_id: int,
     payload: ItemStatusUpdateRequest,
-    principal: Principal = Depends(require_roles(UserRole.ADMIN, UserRole.MANAGER)),
+    principal: Principal = Depends(WRITE_ACCESS),
     db: Session = Depends(get_db),
 ) -> ItemRead:
     item = _get_item_or_404(db, item_id)
     before = _item_snapshot(item)
 
     item.status = payload.status
+    flag_modified(item, "status")
     item.is_deleted = payload.status == ItemStatus.DISCONTINUED
     item.updated_by_id = principal.user_id
     item.updated_at = datetime.now(timezone.utc)
@@ -502,19 +599,18 @@ def update_item_status(
         entity_id=item.id,
         action="ITEM_STATUS_UPDATE",
         before_state=before,
-        after_state=_item_snapshot(item),
+        after_state=_updated_snapshot(before, item, "status", "is_deleted", "updated_at"),
         note=payload.note,
     )
 
     db.commit()
-    db.refresh(item)
-    return _serialize_item(item)
+    return ItemRead.from_row(item)
 
 
 @app.patch("/api/items/status/bulk", response_model=BulkStatusUpdateResponse)
 def bulk_update_status(
     payload: BulkStatusUpdateRequest,
-    principal: Principal = Depends(require_roles(UserRole.ADMIN, UserRole.MANAGER)),
+    principal: Principal = Depends(WRITE_ACCESS),
     db: Session = Depends(get_db),
 ) -> BulkStatusUpdateResponse:
     unique_ids = sorted(set(payload.item_ids))
@@ -524,34 +620,46 @@ def bulk_update_status(
     if missing_ids:
         raise HTTPException(status_code=404, detail=f"Items not found: {missing_ids}")
 
+    now = datetime.now(timezone.utc)
+    is_deleted = payload.status == ItemStatus.DISCONTINUED
+    changes = {"status": _STATUS_VALUE[payload.status], "is_deleted": is_deleted, "updated_at": now.isoformat()}
+    audit_rows: list[dict[str, object]] = []
     for item in items:
         before = _item_snapshot(item)
-        item.status = payload.status
-        item.is_deleted = payload.status == ItemStatus.DISCONTINUED
-        item.updated_by_id = principal.user_id
-        item.updated_at = datetime.now(timezone.utc)
-        db.add(item)
-        _create_audit_log(
-            db,
-            actor_user_id=principal.user_id,
-            entity_type="item",
-            entity_id=item.id,
-            action="ITEM_STATUS_BULK_UPDATE",
-            before_state=before,
-            after_state=_item_snapshot(item),
-            note=payload.note,
+        audit_rows.append(
+            _audit_log_values(
+                actor_user_id=principal.user_id,
+                entity_type="item",
+                entity_id=item.id,
+                action="ITEM_STATUS_BULK_UPDATE",
+                before_state=before,
+                after_state={**before, **changes},
+                note=payload.note,
+            )
         )
 
+    # One UPDATE for the whole set; the loaded items only feed the before-state snapshots above.
+    # RETURNING reports the rows the statement actually touched.
+    updated_ids = db.scalars(
+        update(Item)
+        .where(Item.id.in_(unique_ids))
+        .values(status=payload.status, is_deleted=is_deleted, updated_by_id=principal.user_id, updated_at=now)
+        .returning(Item.id),
+        execution_options={"synchronize_session": False},
+    ).all()
+    db.execute(insert(AuditLog), audit_rows)
     db.commit()
 
-    return BulkStatusUpdateResponse(updated_count=len(items), status=payload.status, item_ids=unique_ids)
+    return BulkStatusUpdateResponse(
+        updated_count=len(updated_ids), status=payload.status, item_ids=sorted(updated_ids)
+    )
 
 
 @app.post("/api/items/{item_id}/quantity", response_model=ItemRead)
 def adjust_quantity(
     item_id: int,
     payload: QuantityAdjustmentRequest,
-    principal: Principal = Depends(require_roles(UserRole.ADMIN, UserRole.MANAGER)),
+    principal: Principal = Depends(WRITE_ACCESS),
     db: Session = Depends(get_db),
 ) -> ItemRead:
     item = _get_item_or_404(db, item_id)
@@ -573,7 +681,6 @@ def adjust_quantity(
 
     before_snapshot = _item_snapshot(item)
     item.quantity = quantity_after
-    item.status = _derive_stock_status(item)
     item.updated_by_id = principal.user_id
     item.updated_at = datetime.now(timezone.utc)
 
@@ -589,6 +696,8 @@ def adjust_quantity(
 
     db.add(item)
     db.add(event)
+    # Flushing applies the derived status before it is snapshotted.
+    db.flush()
     _create_audit_log(
         db,
         actor_user_id=principal.user_id,
@@ -596,41 +705,62 @@ def adjust_quantity(
         entity_id=item.id,
         action="ITEM_QUANTITY_ADJUST",
         before_state=before_snapshot,
-        after_state=_item_snapshot(item),
+        after_state=_updated_snapshot(before_snapshot, item, "quantity", "status", "updated_at"),
         note=payload.note,
     )
 
     db.commit()
-    db.refresh(item)
-    return _serialize_item(item)
+    return ItemRead.from_row(item)
 
 
 @app.get("/api/audit", response_model=list[AuditLogRead])
 def list_audit_logs(
     limit: int = Query(default=50, ge=1, le=500),
-    _: Principal = Depends(require_roles(UserRole.ADMIN, UserRole.MANAGER, UserRole.VIEWER)),
+    _: Principal = Depends(READ_ACCESS),
     db: Session = Depends(get_db),
 ) -> list[AuditLogRead]:
-    logs = db.scalars(select(AuditLog).order_by(AuditLog.created_at.desc()).limit(limit)).all()
-    return [AuditLogRead.model_validate(log) for log in logs]
+    rows = db.execute(select(*_AUDIT_READ_COLUMNS).order_by(AuditLog.created_at.desc()).limit(limit)).all()
+    return [AuditLogRead.from_row(row) for row in rows]
+
+
+# The last rendered dashboard body, reused while nothing it depends on has changed. API writes
+# always add an audit row and item writes move the counters, so either advances the key; the
+# TTL bounds staleness from writes made outside the API.
+DASHBOARD_CACHE_TTL_SECONDS = 30.0
+_dashboard_cache: tuple[tuple[object, ...], float, bytes] | None = None
+_dashboard_cache_lock = threading.Lock()
 
 
 @app.get("/api/dashboard", response_model=DashboardSummary)
 def dashboard(
-    _: Principal = Depends(require_roles(UserRole.ADMIN, UserRole.MANAGER, UserRole.VIEWER)),
+    _: Principal = Depends(READ_ACCESS),
     db: Session = Depends(get_db),
-) -> DashboardSummary:
-    active_items = db.scalars(select(Item).where(Item.is_deleted.is_(False))).all()
-    total_items = db.scalar(select(func.count()).select_from(Item)) or 0
-
-    low_stock_alerts = sum(
-        1
-        for item in active_items
-        if item.status in {ItemStatus.LOW_STOCK, ItemStatus.ORDERED} or item.quantity <= item.reorder_threshold
+) -> Response:
+    global _dashboard_cache
+
+    totals = None
+    if inventory_totals_maintained(db.get_bind().dialect.name):
+        totals = db.get(InventoryTotals, INVENTORY_TOTALS_ID)
+    if totals is None:
+        # The counter row is created at startup (or by migration 008); reads never write it.
+        totals = inventory_totals_aggregate(db.connection())
+
+    latest_audit_id, latest_audit_at = db.execute(
+        select(func.max(AuditLog.id), func.max(AuditLog.created_at))
+    ).one()
+    cache_key = (
+        latest_audit_id,
+        latest_audit_at,
+        totals.total_items,
+        totals.active_items,
+        totals.low_stock_alerts,
+        totals.total_quantity,
+        totals.total_inventory_value,
     )
-
-    total_quantity = sum(item.quantity for item in active_items)
-    total_inventory_value = round(sum(item.quantity * item.unit_cost for item in active_items), 2)
+    with _dashboard_cache_lock:
+        cached = _dashboard_cache
+    if cached is not None and cached[0] == cache_key and cached[1] > time.monotonic():
+        return Response(content=cached[2], media_type="application/json")
 
     category_rows = db.execute(
         select(Item.category, func.count(Item.id))
@@ -640,28 +770,51 @@ def dashboard(
     ).all()
     items_by_category = [CategorySummary(category=category, count=count) for category, count in category_rows]
 
-    recent_activity = db.scalars(select(AuditLog).order_by(AuditLog.created_at.desc()).limit(12)).all()
+    recent_activity = db.execute(
+        select(*_AUDIT_READ_COLUMNS).order_by(AuditLog.created_at.desc()).limit(12)
+    ).all()
 
-    return DashboardSummary(
-        total_items=int(total_items),
-        active_items=len(active_items),
-        low_stock_alerts=low_stock_alerts,
-        total_quantity=total_quantity,
-        total_inventory_value=total_inventory_value,
+    summary = DashboardSummary(
+        total_items=totals.total_items,
+        active_items=totals.active_items,
+        low_stock_alerts=totals.low_stock_alerts,
+        total_quantity=totals.total_quantity,
+        total_inventory_value=round(totals.total_inventory_value, 2),
         items_by_category=items_by_category,
-        recent_activity=[AuditLogRead.model_validate(row) for row in recent_activity],
+        recent_activity=[AuditLogRead.from_row(row) for row in recent_activity],
     )
+    response = ORJSONResponse(summary.model_dump(mode="json"))
+    with _dashboard_cache_lock:
+        _dashboard_cache = (cache_key, time.monotonic() + DASHBOARD_CACHE_TTL_SECONDS, bytes(response.body))
+    return response
+
+
+def _load_reorder_items(db: Session) -> Sequence[Row]:
+    return db.execute(
+        select(
+            Item.id,
+            Item.sku,
+            Item.name,
+            Item.status,
+            Item.quantity,
+            Item.reorder_threshold,
+            Item.is_deleted,
+        ).where(Item.is_deleted.is_(False))
+    ).all()
 
 
-@app.get("/api/ai/reorder-suggestions", response_model=ReorderSuggestionResponse)
-def ai_reorder_suggestions(
-    limit: int = Query(default=20, ge=1, le=100),
-    _: Principal = Depends(require_roles(UserRole.ADMIN, UserRole.MANAGER, UserRole.VIEWER)),
-    db: Session = Depends(get_db),
-) -> ReorderSuggestionResponse:
-    items = db.scalars(select(Item).where(Item.is_deleted.is_(False))).all()
-    result = build_reorder_suggestions(items, limit=limit)
+def _load_anomaly_inputs(db: Session, days: int) -> tuple[list[QuantityEvent], dict[int, Row]]:
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    rows = db.execute(
+        select(QuantityEvent, Item.id, Item.sku, Item.name)
+        .join(Item, Item.id == QuantityEvent.item_id)
+        .where(QuantityEvent.created_at >= cutoff)
+    ).all()
+    # Only items with events in the window are needed for the alert lookups.
+    return [row[0] for row in rows], {row.id: row for row in rows}
+
 
+def _reorder_response(result: dict[str, object]) -> ReorderSuggestionResponse:
     return ReorderSuggestionResponse(
         source=str(result["source"]),
         model=result.get("model"),
@@ -669,29 +822,61 @@ def ai_reorder_suggestions(
     )
 
 
+def _anomaly_response(result: dict[str, object]) -> AnomalyAlertResponse:
+    return AnomalyAlertResponse(
+        source=str(result["source"]),
+        model=result.get("model"),
+        alerts=list(result["alerts"]),
+    )
+
+
+@app.get("/api/ai/reorder-suggestions", response_model=ReorderSuggestionResponse)
+def ai_reorder_suggestions(
+    limit: int = Query(default=20, ge=1, le=100),
+    _: Principal = Depends(READ_ACCESS),
+    db: Session = Depends(get_db),
+) -> ReorderSuggestionResponse:
+    return _reorder_response(build_reorder_suggestions(_load_reorder_items(db), limit=limit))
+
+
 @app.get("/api/ai/anomaly-alerts", response_model=AnomalyAlertResponse)
 def ai_anomaly_alerts(
     days: int = Query(default=30, ge=1, le=365),
     limit: int = Query(default=20, ge=1, le=100),
-    _: Principal = Depends(require_roles(UserRole.ADMIN, UserRole.MANAGER, UserRole.VIEWER)),
+    _: Principal = Depends(READ_ACCESS),
     db: Session = Depends(get_db),
 ) -> AnomalyAlertResponse:
-    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
-    events = db.scalars(select(QuantityEvent).where(QuantityEvent.created_at >= cutoff)).all()
-    item_index = {item.id: item for item in db.scalars(select(Item)).all()}
+    events, item_index = _load_anomaly_inputs(db, days)
+    return _anomaly_response(build_anomaly_alerts(events, item_index=item_index, limit=limit))
 
-    result = build_anomaly_alerts(events, item_index=item_index, limit=limit)
-    return AnomalyAlertResponse(
-        source=str(result["source"]),
-        model=result.get("model"),
-        alerts=list(result["alerts"]),
+
+@app.get("/api/ai/insights", response_model=AiInsightsResponse)
+def ai_insights(
+    reorder_limit: int = Query(default=20, ge=1, le=100),
+    days: int = Query(default=30, ge=1, le=365),
+    anomaly_limit: int = Query(default=20, ge=1, le=100),
+    _: Principal = Depends(READ_ACCESS),
+    db: Session = Depends(get_db),
+) -> AiInsightsResponse:
+    # Both AI panels in one request, annotated by a single model call.
+    events, item_index = _load_anomaly_inputs(db, days)
+    result = build_ai_insights(
+        _load_reorder_items(db),
+        events,
+        item_index=item_index,
+        reorder_limit=reorder_limit,
+        anomaly_limit=anomaly_limit,
+    )
+    return AiInsightsResponse(
+        reorder=_reorder_response(result["reorder"]),
+        anomalies=_anomaly_response(result["anomalies"]),
     )
 
 
 @app.post("/api/ai/natural-language-search", response_model=NaturalLanguageSearchResponse)
 def ai_natural_language_search(
     payload: NaturalLanguageSearchRequest,
-    _: Principal = Depends(require_roles(UserRole.ADMIN, UserRole.MANAGER, UserRole.VIEWER)),
+    _: Principal = Depends(READ_ACCESS),
     db: Session = Depends(get_db),
 ) -> NaturalLanguageSearchResponse:
     parsed = parse_natural_language_filters(payload.query)
@@ -701,21 +886,16 @@ def ai_natural_language_search(
 
     min_qty = parsed.get("min_qty")
     max_qty = parsed.get("max_qty")
-    stmt = _build_item_filter_query(
+    stmt = _natural_language_search_stmt(
         q=str(parsed.get("q") or payload.query),
         category=str(parsed.get("category") or "") or None,
         status_filter=status_filter,
         min_qty=int(min_qty) if isinstance(min_qty, int) else None,
         max_qty=int(max_qty) if isinstance(max_qty, int) else None,
-        include_deleted=False,
-    )
-
-    stmt = _apply_sort(
-        stmt,
         sort_by=str(parsed.get("sort_by") or "updated_at"),
         sort_dir=str(parsed.get("sort_dir") or "desc"),
     )
-    items = db.scalars(stmt.limit(100)).all()
+    rows = db.execute(stmt).all()
 
     parsed_filters = {
         "q": str(parsed.get("q") or payload.query),
@@ -729,5 +909,5 @@ def ai_natural_language_search(
         source=str(parsed.get("source") or "fallback"),
         model=str(parsed.get("model")) if parsed.get("model") else None,
         parsed_filters=parsed_filters,
-        items=[_serialize_item(item) for item in items],
+        items=[ItemRead.from_row(row) for row in rows],
     )
@@ -1,8 +1,30 @@
 from datetime import datetime, timezone
 from enum import StrEnum
 
-from sqlalchemy import Boolean, DateTime, Enum, Float, ForeignKey, Integer, String, Text
+import orjson
+from sqlalchemy import (
+    Boolean,
+    Connection,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    Row,
+    String,
+    Text,
+    and_,
+    column,
+    event,
+    func,
+    inspect,
+    table,
+    text,
+)
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.sql.functions import FunctionElement
+from sqlalchemy.types import TypeDecorator
 
 from app.database import Base
 
@@ -26,6 +48,59 @@ class QuantityEventType(StrEnum):
     ADJUSTMENT = "adjustment"
 
 
+class UTCDateTime(TypeDecorator):
+    # Timestamps are UTC-aware in Python whatever the backend returns: SQLite hands back the naive
+    # stored text and Postgres uses the session time zone. Without this, a route-assigned aware
+    # value and a database-stamped naive one would serialize differently in the same response.
+    impl = DateTime(timezone=True)
+    cache_ok = True
+
+    def process_bind_param(self, value: datetime | None, dialect) -> datetime | None:
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value
+
+    def process_result_value(self, value: datetime | None, dialect) -> datetime | None:
+        if value is None:
+            return None
+        if value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc)
+
+
+class utcnow(FunctionElement):
+    # Timestamp defaults are rendered into the INSERT/UPDATE and stamped by the database, so
+    # writes don't build a Python datetime per column; eager_defaults on Base reads them back.
+    type = UTCDateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _compile_utcnow(_element, _compiler, **_kw) -> str:
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(utcnow, "sqlite")
+def _compile_utcnow_sqlite(_element, _compiler, **_kw) -> str:
+    # CURRENT_TIMESTAMP only has whole seconds on SQLite; keep milliseconds so ordering holds.
+    return "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+
+
+class StrEnumType(TypeDecorator):
+    # Stores a StrEnum by value in a plain VARCHAR. Members are already str, so binds reach the
+    # driver untouched; loaded strings map back to members with a single dict lookup.
+    impl = String
+    cache_ok = True
+
+    def __init__(self, enum_class: type[StrEnum], length: int = 16) -> None:
+        super().__init__(length)
+        self.enum_class = enum_class
+        self._members = {member.value: member for member in enum_class}
+
+    def process_result_value(self, value: str | None, dialect) -> StrEnum | None:
+        return self._members[value] if value is not None else None
+
+
 class UserAccount(Base):
     __tablename__ = "users"
 
@@ -33,16 +108,16 @@ class UserAccount(Base):
     username: Mapped[str] = mapped_column(String(64), unique=True, nullable=False, index=True)
     full_name: Mapped[str] = mapped_column(String(120), nullable=False)
     password_hash: Mapped[str] = mapped_column(String(128), nullable=False)
-    role: Mapped[UserRole] = mapped_column(Enum(UserRole), nullable=False, index=True)
+    role: Mapped[UserRole] = mapped_column(StrEnumType(UserRole), nullable=False)
     api_key: Mapped[str] = mapped_column(String(120), unique=True, nullable=False, index=True)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False
+        UTCDateTime(), default=utcnow(), nullable=False
     )
     updated_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True),
-        default=lambda: datetime.now(timezone.utc),
-        onupdate=lambda: datetime.now(timezone.utc),
+        UTCDateTime(),
+        default=utcnow(),
+        onupdate=utcnow(),
         nullable=False,
     )
 
@@ -68,51 +143,207 @@ class Item(Base):
     reorder_threshold: Mapped[int] = mapped_column(Integer, default=10, nullable=False)
     unit_cost: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
     status: Mapped[ItemStatus] = mapped_column(
-        Enum(ItemStatus), default=ItemStatus.IN_STOCK, nullable=False, index=True
+        StrEnumType(ItemStatus), default=ItemStatus.IN_STOCK, nullable=False
     )
     is_deleted: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     created_by_id: Mapped[int | None] = mapped_column(ForeignKey("users.id"), nullable=True)
     updated_by_id: Mapped[int | None] = mapped_column(ForeignKey("users.id"), nullable=True)
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False, index=True
+        UTCDateTime(), default=utcnow(), nullable=False, index=True
     )
     updated_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True),
-        default=lambda: datetime.now(timezone.utc),
-        onupdate=lambda: datetime.now(timezone.utc),
+        UTCDateTime(),
+        default=utcnow(),
+        onupdate=utcnow(),
         nullable=False,
     )
 
+    # Item routes serialize columns only; a relationship read there would be an N+1, so it raises
+    # instead. Load these explicitly with selectinload()/joinedload() where they are needed.
     created_by: Mapped[UserAccount | None] = relationship(
-        foreign_keys=[created_by_id], back_populates="created_items"
+        foreign_keys=[created_by_id], back_populates="created_items", lazy="raise_on_sql"
     )
     updated_by: Mapped[UserAccount | None] = relationship(
-        foreign_keys=[updated_by_id], back_populates="updated_items"
+        foreign_keys=[updated_by_id], back_populates="updated_items", lazy="raise_on_sql"
     )
     quantity_events: Mapped[list["QuantityEvent"]] = relationship(
-        back_populates="item", cascade="all, delete-orphan"
+        back_populates="item", cascade="all, delete-orphan", lazy="raise_on_sql"
     )
 
 
+def derive_stock_status(
+    status: ItemStatus | None, quantity: int, reorder_threshold: int, *, keep_ordered: bool = True
+) -> ItemStatus:
+    if status == ItemStatus.DISCONTINUED:
+        return ItemStatus.DISCONTINUED
+
+    if keep_ordered and status == ItemStatus.ORDERED and quantity <= reorder_threshold:
+        return ItemStatus.ORDERED
+
+    if quantity <= reorder_threshold:
+        return ItemStatus.LOW_STOCK
+
+    return ItemStatus.IN_STOCK
+
+
+# Status follows stock levels at flush time unless the write set it explicitly; routes that
+# assign status (even to its current value) call flag_modified(item, "status") to keep it.
+@event.listens_for(Item, "before_insert")
+def _derive_status_on_insert(_mapper, _connection, item: Item) -> None:
+    if item.status is None:
+        item.status = derive_stock_status(None, item.quantity, item.reorder_threshold, keep_ordered=False)
+
+
+@event.listens_for(Item, "before_update")
+def _derive_status_on_update(_mapper, _connection, item: Item) -> None:
+    # Every other update re-derives it, as item edits always did, so a stored status that went
+    # stale without a stock change is corrected by the next edit.
+    if not inspect(item).attrs.status.history.has_changes():
+        item.status = derive_stock_status(item.status, item.quantity, item.reorder_threshold)
+
+
+# Default item listing: active rows ordered by most recent update.
+Index(
+    "ix_items_active_updated_at",
+    Item.updated_at,
+    sqlite_where=Item.is_deleted.is_(False),
+    postgresql_where=Item.is_deleted.is_(False),
+)
+# Filtered listings: active rows for a category (matched case-insensitively) and status,
+# walked in updated_at order.
+Index("ix_items_list_hot", Item.is_deleted, func.lower(Item.category), Item.status, Item.updated_at)
+# Status alone has a handful of values, so only the low-stock view gets its own (partial) index;
+# it returns active low-stock rows in listing order without touching the rest of the table.
+Index(
+    "ix_items_low_stock",
+    Item.updated_at,
+    sqlite_where=and_(Item.status == ItemStatus.LOW_STOCK, Item.is_deleted.is_(False)),
+    postgresql_where=and_(Item.status == ItemStatus.LOW_STOCK, Item.is_deleted.is_(False)),
+)
+
+
+# Enum columns used to store member names ('IN_STOCK'); every stored value is the lower-cased name.
+_ENUM_VALUE_COLUMNS = (("users", "role"), ("items", "status"), ("quantity_events", "event_type"))
+
+
+def ensure_enum_values_stored(connection: Connection) -> None:
+    if connection.dialect.name == "postgresql":
+        _convert_native_enum_columns(connection)
+    for table_name, column_name in _ENUM_VALUE_COLUMNS:
+        connection.execute(
+            text(
+                f"UPDATE {table_name} SET {column_name} = lower({column_name}) "
+                f"WHERE {column_name} <> lower({column_name})"
+            )
+        )
+
+
+def _convert_native_enum_columns(connection: Connection) -> None:
+    # Postgres databases created with Enum() columns hold native ENUM types labelled with member
+    # names, which cannot take the lower-cased values; convert them to the VARCHAR the models use.
+    for table_name, column_name in _ENUM_VALUE_COLUMNS:
+        enum_type = connection.scalar(
+            text(
+                "SELECT udt_name FROM information_schema.columns "
+                "WHERE table_name = :table_name AND column_name = :column_name AND data_type = 'USER-DEFINED'"
+            ),
+            {"table_name": table_name, "column_name": column_name},
+        )
+        if enum_type is None:
+            continue
+        column_type = Base.metadata.tables[table_name].c[column_name].type.compile(dialect=connection.dialect)
+        connection.execute(
+            text(
+                f"ALTER TABLE {table_name} ALTER COLUMN {column_name} "
+                f"TYPE {column_type} USING lower({column_name}::text)"
+            )
+        )
+        connection.execute(text(f'DROP TYPE IF EXISTS "{enum_type}"'))
+
+
+# Substring search over name/sku/category/details. SQLite keeps an external-content
+# FTS5 trigram table in sync through triggers; Postgres backs ILIKE with pg_trgm GIN
+# indexes. Neither is part of Base.metadata, so they are managed by the hooks below.
+item_search = table("items_fts", column("rowid", Integer), column("items_fts", Text))
+
+_SQLITE_ITEM_SEARCH_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5("
+    "name, sku, category, details, content='items', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS items_fts_ai AFTER INSERT ON items BEGIN "
+    "INSERT INTO items_fts(rowid, name, sku, category, details) "
+    "VALUES (new.id, new.name, new.sku, new.category, new.details); END",
+    "CREATE TRIGGER IF NOT EXISTS items_fts_ad AFTER DELETE ON items BEGIN "
+    "INSERT INTO items_fts(items_fts, rowid, name, sku, category, details) "
+    "VALUES ('delete', old.id, old.name, old.sku, old.category, old.details); END",
+    "CREATE TRIGGER IF NOT EXISTS items_fts_au AFTER UPDATE OF name, sku, category, details ON items BEGIN "
+    "INSERT INTO items_fts(items_fts, rowid, name, sku, category, details) "
+    "VALUES ('delete', old.id, old.name, old.sku, old.category, old.details); "
+    "INSERT INTO items_fts(rowid, name, sku, category, details) "
+    "VALUES (new.id, new.name, new.sku, new.category, new.details); END",
+)
+
+_POSTGRES_ITEM_SEARCH_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    *(
+        f"CREATE INDEX IF NOT EXISTS ix_items_{field}_trgm ON items USING gin ({field} gin_trgm_ops)"
+        for field in ("name", "sku", "category", "details")
+    ),
+)
+
+
+def ensure_item_search_index(connection: Connection) -> None:
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'items_fts'")
+        ).first()
+        if exists:
+            return
+        for statement in _SQLITE_ITEM_SEARCH_DDL:
+            connection.execute(text(statement))
+        # Index rows that predate the search table.
+        connection.execute(text("INSERT INTO items_fts(items_fts) VALUES ('rebuild')"))
+    elif dialect == "postgresql":
+        for statement in _POSTGRES_ITEM_SEARCH_DDL:
+            connection.execute(text(statement))
+
+
+@event.listens_for(Item.__table__, "after_create")
+def _create_item_search_index(_target, connection: Connection, **_kw) -> None:
+    ensure_item_search_index(connection)
+
+
+@event.listens_for(Item.__table__, "before_drop")
+def _drop_item_search_index(_target, connection: Connection, **_kw) -> None:
+    if connection.dialect.name == "sqlite":
+        connection.execute(text("DROP TABLE IF EXISTS items_fts"))
+
+
 class QuantityEvent(Base):
     __tablename__ = "quantity_events"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    item_id: Mapped[int] = mapped_column(ForeignKey("items.id"), nullable=False, index=True)
-    event_type: Mapped[QuantityEventType] = mapped_column(Enum(QuantityEventType), nullable=False, index=True)
+    item_id: Mapped[int] = mapped_column(ForeignKey("items.id"), nullable=False)
+    event_type: Mapped[QuantityEventType] = mapped_column(
+        StrEnumType(QuantityEventType), nullable=False, index=True
+    )
     quantity_before: Mapped[int] = mapped_column(Integer, nullable=False)
     quantity_delta: Mapped[int] = mapped_column(Integer, nullable=False)
     quantity_after: Mapped[int] = mapped_column(Integer, nullable=False)
     note: Mapped[str | None] = mapped_column(Text, nullable=True)
     actor_user_id: Mapped[int | None] = mapped_column(ForeignKey("users.id"), nullable=True, index=True)
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False, index=True
+        UTCDateTime(), default=utcnow(), nullable=False, index=True
     )
 
     item: Mapped[Item] = relationship(back_populates="quantity_events")
     actor: Mapped[UserAccount | None] = relationship(back_populates="quantity_events")
 
 
+# Per-item event history by time; the item_id prefix also serves plain item_id lookups.
+Index("ix_quantity_events_item_created_at", QuantityEvent.item_id, QuantityEvent.created_at)
+
+
 class AuditLog(Base):
     __tablename__ = "audit_logs"
 
@@ -125,7 +356,120 @@ class AuditLog(Base):
     note: Mapped[str | None] = mapped_column(Text, nullable=True)
     actor_user_id: Mapped[int | None] = mapped_column(ForeignKey("users.id"), nullable=True, index=True)
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False, index=True
+        UTCDateTime(), default=utcnow(), nullable=False, index=True
     )
 
     actor: Mapped[UserAccount | None] = relationship(back_populates="audit_logs")
+
+
+# Dashboard counters kept in a single row so the summary does not scan items. Triggers on
+# items apply each row's contribution as it is inserted, updated or deleted, which also
+# covers bulk Core statements and the seed upserts. Only SQLite gets them: it already runs one
+# writer at a time, whereas on PostgreSQL every concurrent item write would queue on this row's
+# lock, so there the dashboard aggregates items instead.
+INVENTORY_TOTALS_ID = 1
+
+
+class InventoryTotals(Base):
+    __tablename__ = "inventory_totals"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    total_items: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    active_items: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    low_stock_alerts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    total_quantity: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    total_inventory_value: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+
+
+# Matches the dashboard's low-stock rule: flagged low/ordered, or an active status at or below the
+# reorder threshold.
+_ROW_IS_LOW_STOCK_SQL = (
+    "{row}.status IN ('low_stock', 'ordered') "
+    "OR ({row}.status <> 'discontinued' AND {row}.quantity <= {row}.reorder_threshold)"
+)
+
+
+def _inventory_totals_step(row: str, sign: str) -> str:
+    active = f"CASE WHEN {row}.is_deleted THEN 0 ELSE 1 END"
+    low_stock = _ROW_IS_LOW_STOCK_SQL.format(row=row)
+    return (
+        "UPDATE inventory_totals SET "
+        f"total_items = total_items {sign} 1, "
+        f"active_items = active_items {sign} {active}, "
+        f"low_stock_alerts = low_stock_alerts {sign} "
+        f"(CASE WHEN {row}.is_deleted THEN 0 WHEN {low_stock} THEN 1 ELSE 0 END), "
+        f"total_quantity = total_quantity {sign} {active} * {row}.quantity, "
+        f"total_inventory_value = total_inventory_value {sign} {active} * {row}.quantity * {row}.unit_cost "
+        f"WHERE id = {INVENTORY_TOTALS_ID}"
+    )
+
+
+_SQLITE_INVENTORY_TOTALS_DDL = (
+    "CREATE TRIGGER IF NOT EXISTS items_totals_ai AFTER INSERT ON items BEGIN "
+    f"{_inventory_totals_step('new', '+')}; END",
+    "CREATE TRIGGER IF NOT EXISTS items_totals_ad AFTER DELETE ON items BEGIN "
+    f"{_inventory_totals_step('old', '-')}; END",
+    "CREATE TRIGGER IF NOT EXISTS items_totals_au "
+    "AFTER UPDATE OF quantity, reorder_threshold, unit_cost, status, is_deleted ON items BEGIN "
+    f"{_inventory_totals_step('old', '-')}; {_inventory_totals_step('new', '+')}; END",
+)
+
+_INVENTORY_TOTALS_DDL = {"sqlite": _SQLITE_INVENTORY_TOTALS_DDL}
+
+
+def inventory_totals_maintained(dialect: str) -> bool:
+    # Only dialects with counter triggers keep the inventory_totals row current.
+    return dialect in _INVENTORY_TOTALS_DDL
+
+
+_INVENTORY_TOTALS_ACTIVE_SQL = "CASE WHEN is_deleted THEN 0 ELSE 1 END"
+_INVENTORY_TOTALS_AGGREGATE_SQL = (
+    f"SELECT count(*) AS total_items, coalesce(sum({_INVENTORY_TOTALS_ACTIVE_SQL}), 0) AS active_items, "
+    "coalesce(sum(CASE WHEN is_deleted THEN 0 "
+    f"WHEN {_ROW_IS_LOW_STOCK_SQL.format(row='items')} THEN 1 ELSE 0 END), 0) AS low_stock_alerts, "
+    f"coalesce(sum({_INVENTORY_TOTALS_ACTIVE_SQL} * quantity), 0) AS total_quantity, "
+    f"coalesce(sum({_INVENTORY_TOTALS_ACTIVE_SQL} * quantity * unit_cost), 0.0) AS total_inventory_value "
+    "FROM items"
+)
+
+
+def inventory_totals_aggregate(connection: Connection) -> Row:
+    # The same counters computed by scanning items, for dialects without the triggers.
+    return connection.execute(text(_INVENTORY_TOTALS_AGGREGATE_SQL)).one()
+
+
+def ensure_inventory_totals(connection: Connection) -> None:
+    statements = _INVENTORY_TOTALS_DDL.get(connection.dialect.name)
+    if statements is None:
+        # Nothing would keep a seeded row current, so none is written and the dashboard
+        # falls back to inventory_totals_aggregate().
+        return
+    for statement in statements:
+        connection.execute(text(statement))
+    exists = connection.execute(
+        text("SELECT 1 FROM inventory_totals WHERE id = :id"), {"id": INVENTORY_TOTALS_ID}
+    ).first()
+    if exists:
+        return
+    # Seed the counters from rows that predate the table (or that were written without triggers).
+    connection.execute(
+        text(
+            "INSERT INTO inventory_totals "
+            "(id, total_items, active_items, low_stock_alerts, total_quantity, total_inventory_value) "
+            "SELECT :id, total_items, active_items, low_stock_alerts, total_quantity, total_inventory_value "
+            f"FROM ({_INVENTORY_TOTALS_AGGREGATE_SQL}) AS totals"
+        ),
+        {"id": INVENTORY_TOTALS_ID},
+    )
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_inventory_totals(_target, connection: Connection, tables=(), **_kw) -> None:
+    # Existing databases pick the triggers up from the startup upgrade instead, once their
+    # stored enum values have been normalized.
+    if Item.__table__ in tables:
+        ensure_inventory_totals(connection)
+
+
+def dump_audit_state(state: dict[str, object] | None) -> str | None:
+    return orjson.dumps(state).decode() if state is not None else None
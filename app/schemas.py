@@ -1,13 +1,26 @@
 from datetime import datetime
+from typing import Self
 
-from pydantic import BaseModel, ConfigDict, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, field_validator
 
 from app.models import ItemStatus, QuantityEventType, UserRole
 
+# Shared by the models built from ORM rows. extra="ignore" and defer_build=False are the
+# pydantic defaults, pinned so the core schemas stay compiled at import, not on first request.
+READ_MODEL_CONFIG = ConfigDict(from_attributes=True, extra="ignore", defer_build=False)
 
-class UserRead(BaseModel):
-    model_config = ConfigDict(from_attributes=True)
 
+class ReadModel(BaseModel):
+    model_config = READ_MODEL_CONFIG
+
+    @classmethod
+    def from_row(cls, row: object) -> Self:
+        # For ORM instances and result rows, whose values the column types already guarantee;
+        # skips validation. Anything from outside the database goes through model_validate.
+        return cls.model_construct(**{field: getattr(row, field) for field in cls.model_fields})
+
+
+class UserRead(ReadModel):
     id: int
     username: str
     full_name: str
@@ -16,6 +29,10 @@ class UserRead(BaseModel):
     created_at: datetime
 
 
+# Validates a whole result set in one pydantic-core call instead of one model_validate per row.
+USER_READ_LIST_ADAPTER = TypeAdapter(list[UserRead])
+
+
 class LoginRequest(BaseModel):
     username: str = Field(min_length=3, max_length=64)
     password: str = Field(min_length=6, max_length=128)
@@ -56,9 +73,7 @@ class ItemUpdate(BaseModel):
     status: ItemStatus | None = None
 
 
-class ItemRead(BaseModel):
-    model_config = ConfigDict(from_attributes=True)
-
+class ItemRead(ReadModel):
     id: int
     sku: str
     name: str
@@ -110,9 +125,7 @@ class BulkStatusUpdateResponse(BaseModel):
     item_ids: list[int]
 
 
-class AuditLogRead(BaseModel):
-    model_config = ConfigDict(from_attributes=True)
-
+class AuditLogRead(ReadModel):
     id: int
     entity_type: str
     entity_id: int | None
@@ -173,6 +186,11 @@ class AnomalyAlertResponse(BaseModel):
     alerts: list[AnomalyAlert]
 
 
+class AiInsightsResponse(BaseModel):
+    reorder: ReorderSuggestionResponse
+    anomalies: AnomalyAlertResponse
+
+
 class NaturalLanguageSearchRequest(BaseModel):
     query: str = Field(min_length=3, max_length=300)
 
@@ -1,17 +1,37 @@
 from __future__ import annotations
 
+import heapq
 import json
-import math
 import os
+import random
 import re
-from datetime import datetime
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable, Sequence
+from datetime import datetime, timezone
+from functools import lru_cache
+
+import numpy as np
 
 from app.models import Item, ItemStatus, QuantityEvent
 
 try:
-    from openai import OpenAI
+    from openai import APIConnectionError, APITimeoutError, InternalServerError, OpenAI, RateLimitError
+
+    # APITimeoutError subclasses APIConnectionError; both are listed for clarity.
+    _RETRYABLE_ERRORS: tuple[type[Exception], ...] = (
+        RateLimitError,
+        APITimeoutError,
+        APIConnectionError,
+        InternalServerError,
+    )
 except Exception:  # pragma: no cover - optional dependency for offline fallback mode
     OpenAI = None  # type: ignore[assignment]
+    _RETRYABLE_ERRORS = ()
+
+_RETRY_BASE_SECONDS = 0.5
+_RETRY_MAX_DELAY_SECONDS = 8.0
 
 
 def _get_openai_client() -> tuple[object | None, str | None]:
@@ -20,67 +40,187 @@ def _get_openai_client() -> tuple[object | None, str | None]:
     if not api_key or OpenAI is None:
         return None, None
     try:
-        return OpenAI(api_key=api_key), model
+        return _openai_client(api_key, float(os.getenv("OPENAI_TIMEOUT", "15"))), model
     except Exception:
         return None, None
 
 
-def _extract_json_object(text: str) -> dict[str, object] | None:
-    if not text:
-        return None
-    start = text.find("{")
-    end = text.rfind("}")
-    if start < 0 or end < start:
-        return None
+@lru_cache(maxsize=1)
+def _openai_client(api_key: str, timeout: float) -> object:
+    # One client per key/timeout so its HTTP connection pool (and TLS sessions) is reused across requests;
+    # changing either setting simply replaces the cached client. Bound each call so a slow provider cannot
+    # hold a request thread indefinitely. Retries happen in _create_response instead of the SDK, so there
+    # is a single backoff policy.
+    return OpenAI(api_key=api_key, timeout=timeout, max_retries=0)
+
+
+def _retry_delay(error: Exception, attempt: int) -> float:
+    # Honour the provider's Retry-After when it sends one; otherwise back off exponentially with jitter.
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    for header, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        try:
+            return min(float(headers[header]) * scale, _RETRY_MAX_DELAY_SECONDS)
+        except (KeyError, TypeError, ValueError):
+            continue
+    return min(_RETRY_BASE_SECONDS * 2**attempt, _RETRY_MAX_DELAY_SECONDS) + random.random() * 0.25
+
+
+# Caps concurrent OpenAI calls so a slow provider cannot tie up the whole request thread pool.
+_OPENAI_INFLIGHT = threading.BoundedSemaphore(max(1, int(os.getenv("OPENAI_MAX_INFLIGHT", "8"))))
+_OPENAI_INFLIGHT_WAIT_SECONDS = 1.0
+
+
+def _create_response(client: object, **request: object) -> object:
+    # Transient failures (rate limits, timeouts, dropped connections, 5xx) are retried; anything
+    # else, the last failure, or no free in-flight slot propagates to the caller's fallback.
+    retries = max(0, int(os.getenv("OPENAI_MAX_RETRIES", "2")))
+    attempt = 0
+    while True:
+        if not _OPENAI_INFLIGHT.acquire(timeout=_OPENAI_INFLIGHT_WAIT_SECONDS):
+            raise RuntimeError("Too many OpenAI requests in flight")
+        try:
+            return client.responses.create(**request)  # type: ignore[attr-defined]
+        except _RETRYABLE_ERRORS as error:
+            if attempt >= retries:
+                raise
+            delay = _retry_delay(error, attempt)
+        finally:
+            _OPENAI_INFLIGHT.release()
+        # Back off without holding a slot.
+        time.sleep(delay)
+        attempt += 1
+
+
+def _worth_annotating(rows: Sequence[object]) -> bool:
+    # A couple of rows read fine with the rule-based text; not worth a model round trip.
+    return len(rows) >= max(1, int(os.getenv("AI_MIN_ITEMS", "3")))
+
+
+# Output caps per call: the per-item reason/note maps, and the small search-filter object.
+_NOTES_MAX_OUTPUT_TOKENS = 512
+_FILTERS_MAX_OUTPUT_TOKENS = 128
+
+
+class _TTLCache:
+    # Thread-safe LRU whose entries also expire, so AI results are reused for a while but not forever.
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float, object]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> object | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: Hashable, value: object) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self._ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Only successful AI responses are cached; the offline fallbacks are cheap to recompute.
+_REORDER_REASON_CACHE = _TTLCache(maxsize=256, ttl=600)
+_NL_FILTER_CACHE = _TTLCache(maxsize=1024, ttl=600)
+
+
+# The reason/note maps are keyed by item id, which strict JSON schemas cannot express, so those
+# calls use JSON mode; the search-filter object has fixed keys and gets a strict schema.
+_JSON_OBJECT_FORMAT = {"format": {"type": "json_object"}}
+_NL_FILTERS_FORMAT = {
+    "format": {
+        "type": "json_schema",
+        "name": "search_filters",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "q": {"type": "string"},
+                "category": {"type": ["string", "null"]},
+                "status": {"type": ["string", "null"], "enum": [*(status.value for status in ItemStatus), None]},
+                "min_qty": {"type": ["integer", "null"]},
+                "max_qty": {"type": ["integer", "null"]},
+                "sort_by": {
+                    "type": "string",
+                    "enum": ["sku", "name", "category", "quantity", "status", "updated_at", "created_at"],
+                },
+                "sort_dir": {"type": "string", "enum": ["asc", "desc"]},
+            },
+            "required": ["q", "category", "status", "min_qty", "max_qty", "sort_by", "sort_dir"],
+            "additionalProperties": False,
+        },
+    }
+}
+
+
+def _parse_json_output(response: object) -> dict[str, object] | None:
+    # The requested text format guarantees a JSON document; only truncation or refusals fail here.
     try:
-        payload = json.loads(text[start : end + 1])
-        if isinstance(payload, dict):
-            return payload
-    except json.JSONDecodeError:
+        payload = json.loads(getattr(response, "output_text", ""))
+    except (TypeError, ValueError):
         return None
-    return None
+    return payload if isinstance(payload, dict) else None
 
 
-def build_reorder_suggestions(items: list[Item], limit: int = 20) -> dict[str, object]:
+_REORDER_STATUSES = frozenset({ItemStatus.LOW_STOCK, ItemStatus.ORDERED})
+
+
+def _reorder_fallback(items: Sequence[Item], limit: int) -> list[dict[str, object]]:
     scoped = [item for item in items if not item.is_deleted and item.status != ItemStatus.DISCONTINUED]
+    count = len(scoped)
 
-    ranked: list[dict[str, object]] = []
-    for item in scoped:
-        target = max(item.reorder_threshold * 2, item.reorder_threshold + 10)
-        recommended = max(0, target - item.quantity)
-        if item.status in {ItemStatus.LOW_STOCK, ItemStatus.ORDERED} or recommended > 0:
-            ranked.append(
-                {
-                    "item_id": item.id,
-                    "sku": item.sku,
-                    "name": item.name,
-                    "status": item.status,
-                    "current_quantity": item.quantity,
-                    "reorder_threshold": item.reorder_threshold,
-                    "recommended_order_qty": recommended,
-                    "reason": (
-                        "Quantity is at/below policy threshold"
-                        if item.quantity <= item.reorder_threshold
-                        else "Maintain target cover stock"
-                    ),
-                }
-            )
+    quantity = np.fromiter((item.quantity for item in scoped), dtype=np.int64, count=count)
+    threshold = np.fromiter((item.reorder_threshold for item in scoped), dtype=np.int64, count=count)
+    flagged = np.fromiter((item.status in _REORDER_STATUSES for item in scoped), dtype=bool, count=count)
+
+    target = np.maximum(threshold * 2, threshold + 10)
+    recommended = np.maximum(target - quantity, 0)
+    at_threshold = quantity <= threshold
 
-    ranked.sort(
-        key=lambda row: (
-            0 if row["current_quantity"] <= row["reorder_threshold"] else 1,
-            -int(row["recommended_order_qty"]),
-            str(row["sku"]),
+    # Rank by (at/below threshold first, largest order first, sku) and only build rows for the top `limit`.
+    candidates = np.flatnonzero(flagged | (recommended > 0))
+    skus = np.array([scoped[index].sku for index in candidates], dtype=str)
+    order = np.lexsort((skus, -recommended[candidates], ~at_threshold[candidates]))[:limit]
+
+    fallback: list[dict[str, object]] = []
+    for index in candidates[order]:
+        item = scoped[index]
+        fallback.append(
+            {
+                "item_id": item.id,
+                "sku": item.sku,
+                "name": item.name,
+                "status": item.status,
+                "current_quantity": item.quantity,
+                "reorder_threshold": item.reorder_threshold,
+                "recommended_order_qty": int(recommended[index]),
+                "reason": (
+                    "Quantity is at/below policy threshold"
+                    if at_threshold[index]
+                    else "Maintain target cover stock"
+                ),
+            }
         )
-    )
-    fallback = ranked[:limit]
+    return fallback
 
-    client, model = _get_openai_client()
-    if client is None or not fallback:
-        return {"source": "fallback", "model": None, "suggestions": fallback}
 
-    try:
-        prompt_payload = [
+def _reorder_payload_json(rows: list[dict[str, object]]) -> str:
+    return json.dumps(
+        [
             {
                 "item_id": row["item_id"],
                 "sku": row["sku"],
@@ -90,63 +230,90 @@ def build_reorder_suggestions(items: list[Item], limit: int = 20) -> dict[str, o
                 "reorder_threshold": row["reorder_threshold"],
                 "recommended_order_qty": row["recommended_order_qty"],
             }
-            for row in fallback
+            for row in rows
         ]
+    )
 
-        response = client.responses.create(  # type: ignore[union-attr]
-            model=model,
-            input=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are an inventory analyst. Return strict JSON with this shape: "
-                        "{\"reasons\": {\"<item_id>\": \"short explanation\"}}"
-                    ),
-                },
-                {
-                    "role": "user",
-                    "content": f"Provide concise reorder reason per item: {json.dumps(prompt_payload)}",
-                },
-            ],
-        )
 
-        parsed = _extract_json_object(getattr(response, "output_text", ""))
-        reason_map = parsed.get("reasons", {}) if parsed else {}
-        if isinstance(reason_map, dict):
-            for row in fallback:
-                candidate = reason_map.get(str(row["item_id"]))
-                if isinstance(candidate, str) and candidate.strip():
-                    row["reason"] = candidate.strip()
+def _apply_reorder_reasons(rows: list[dict[str, object]], reason_map: object) -> None:
+    if isinstance(reason_map, dict):
+        for row in rows:
+            candidate = reason_map.get(str(row["item_id"]))
+            if isinstance(candidate, str) and candidate.strip():
+                row["reason"] = candidate.strip()
+
+
+def build_reorder_suggestions(items: Sequence[Item], limit: int = 20) -> dict[str, object]:
+    fallback = _reorder_fallback(items, limit)
+
+    client, model = _get_openai_client()
+    if client is None or not _worth_annotating(fallback):
+        return {"source": "fallback", "model": None, "suggestions": fallback}
+
+    try:
+        payload_json = _reorder_payload_json(fallback)
+        cache_key = (model, payload_json)
+        reason_map = _REORDER_REASON_CACHE.get(cache_key)
+        if reason_map is None:
+            response = _create_response(
+                client,
+                model=model,
+                max_output_tokens=_NOTES_MAX_OUTPUT_TOKENS,
+                text=_JSON_OBJECT_FORMAT,
+                input=[
+                    {
+                        "role": "system",
+                        "content": (
+                            "You are an inventory analyst. Return strict JSON with this shape: "
+                            "{\"reasons\": {\"<item_id>\": \"short explanation\"}}"
+                        ),
+                    },
+                    {
+                        "role": "user",
+                        "content": f"Provide concise reorder reason per item: {payload_json}",
+                    },
+                ],
+            )
+
+            parsed = _parse_json_output(response)
+            reason_map = parsed.get("reasons", {}) if parsed else {}
+            if isinstance(reason_map, dict):
+                _REORDER_REASON_CACHE.set(cache_key, reason_map)
+        _apply_reorder_reasons(fallback, reason_map)
 
         return {"source": "ai", "model": model, "suggestions": fallback}
     except Exception:
         return {"source": "fallback", "model": None, "suggestions": fallback}
 
 
-def build_anomaly_alerts(
+def _anomaly_fallback(
     events: list[QuantityEvent],
     item_index: dict[int, Item],
-    limit: int = 20,
-) -> dict[str, object]:
+    limit: int,
+) -> list[dict[str, object]]:
     if not events:
-        return {"source": "fallback", "model": None, "alerts": []}
+        return []
 
-    magnitudes = [abs(event.quantity_delta) for event in events]
-    avg = sum(magnitudes) / len(magnitudes)
-    variance = sum((value - avg) ** 2 for value in magnitudes) / max(1, len(magnitudes) - 1)
-    std = math.sqrt(variance)
+    magnitudes = np.abs(np.fromiter((event.quantity_delta for event in events), dtype=np.int64, count=len(events)))
+    avg = float(magnitudes.mean())
+    std = float(magnitudes.std(ddof=1)) if len(magnitudes) > 1 else 0.0
     threshold = max(10.0, avg + (2 * std))
 
+    # Newest `limit` exceedances for known items; a bounded heap selection instead of sorting them all.
+    exceeding = heapq.nlargest(
+        limit,
+        (
+            events[index]
+            for index in np.flatnonzero(magnitudes >= threshold)
+            if events[index].item_id in item_index
+        ),
+        key=lambda row: row.created_at,
+    )
+
     fallback: list[dict[str, object]] = []
-    for event in sorted(events, key=lambda row: row.created_at, reverse=True):
+    for event in exceeding:
         magnitude = abs(event.quantity_delta)
-        if magnitude < threshold:
-            continue
-
-        item = item_index.get(event.item_id)
-        if not item:
-            continue
-
+        item = item_index[event.item_id]
         severity = "high" if magnitude >= threshold * 1.5 else "medium"
         fallback.append(
             {
@@ -163,16 +330,55 @@ def build_anomaly_alerts(
                 "created_at": event.created_at,
             }
         )
-        if len(fallback) >= limit:
-            break
+    return fallback
+
+
+def _anomaly_payload_json(rows: list[dict[str, object]]) -> str:
+    return json.dumps(
+        [
+            {
+                "item_id": row["item_id"],
+                "sku": row["sku"],
+                "name": row["name"],
+                "severity": row["severity"],
+                "quantity_delta": row["quantity_delta"],
+                "created_at": str(row["created_at"]),
+            }
+            for row in rows
+        ]
+    )
+
+
+def _apply_anomaly_notes(rows: list[dict[str, object]], note_map: object) -> None:
+    if isinstance(note_map, dict):
+        for row in rows:
+            node = note_map.get(str(row["item_id"]))
+            if isinstance(node, dict):
+                explanation = node.get("explanation")
+                action = node.get("action")
+                if isinstance(explanation, str) and explanation.strip():
+                    row["explanation"] = explanation.strip()
+                if isinstance(action, str) and action.strip():
+                    row["suggested_action"] = action.strip()
+
+
+def build_anomaly_alerts(
+    events: list[QuantityEvent],
+    item_index: dict[int, Item],
+    limit: int = 20,
+) -> dict[str, object]:
+    fallback = _anomaly_fallback(events, item_index, limit)
 
     client, model = _get_openai_client()
-    if client is None or not fallback:
+    if client is None or not _worth_annotating(fallback):
         return {"source": "fallback", "model": None, "alerts": fallback}
 
     try:
-        response = client.responses.create(  # type: ignore[union-attr]
+        response = _create_response(
+            client,
             model=model,
+            max_output_tokens=_NOTES_MAX_OUTPUT_TOKENS,
+            text=_JSON_OBJECT_FORMAT,
             input=[
                 {
                     "role": "system",
@@ -181,41 +387,103 @@ def build_anomaly_alerts(
                         "{\"notes\": {\"<item_id>\": {\"explanation\": \"...\", \"action\": \"...\"}}}"
                     ),
                 },
+                {"role": "user", "content": _anomaly_payload_json(fallback)},
+            ],
+        )
+
+        parsed = _parse_json_output(response)
+        _apply_anomaly_notes(fallback, parsed.get("notes", {}) if parsed else {})
+
+        return {"source": "ai", "model": model, "alerts": fallback}
+    except Exception:
+        return {"source": "fallback", "model": None, "alerts": fallback}
+
+
+def build_ai_insights(
+    items: Sequence[Item],
+    events: list[QuantityEvent],
+    item_index: dict[int, Item],
+    reorder_limit: int = 20,
+    anomaly_limit: int = 20,
+) -> dict[str, dict[str, object]]:
+    # Reorder reasons and anomaly notes from a single completion, for callers that show both.
+    reorder_rows = _reorder_fallback(items, reorder_limit)
+    anomaly_rows = _anomaly_fallback(events, item_index, anomaly_limit)
+    fallback = {
+        "reorder": {"source": "fallback", "model": None, "suggestions": reorder_rows},
+        "anomalies": {"source": "fallback", "model": None, "alerts": anomaly_rows},
+    }
+
+    client, model = _get_openai_client()
+    annotate_reorder = _worth_annotating(reorder_rows)
+    annotate_anomalies = _worth_annotating(anomaly_rows)
+    if client is None or not (annotate_reorder or annotate_anomalies):
+        return fallback
+
+    reorder_json = _reorder_payload_json(reorder_rows)
+    reason_cache_key = (model, reorder_json)
+    cached_reasons = _REORDER_REASON_CACHE.get(reason_cache_key)
+    if cached_reasons is not None or not annotate_reorder or not annotate_anomalies:
+        # Only one side needs the model; the single-purpose builders already cover that.
+        return {
+            "reorder": build_reorder_suggestions(items, limit=reorder_limit),
+            "anomalies": build_anomaly_alerts(events, item_index=item_index, limit=anomaly_limit),
+        }
+
+    try:
+        response = _create_response(
+            client,
+            model=model,
+            max_output_tokens=2 * _NOTES_MAX_OUTPUT_TOKENS,
+            text=_JSON_OBJECT_FORMAT,
+            input=[
+                {
+                    "role": "system",
+                    "content": (
+                        "You are an inventory analyst. Return strict JSON with this shape: "
+                        "{\"reasons\": {\"<item_id>\": \"short reorder explanation\"}, "
+                        "\"notes\": {\"<item_id>\": {\"explanation\": \"...\", \"action\": \"...\"}}}"
+                    ),
+                },
                 {
                     "role": "user",
-                    "content": json.dumps(
-                        [
-                            {
-                                "item_id": row["item_id"],
-                                "sku": row["sku"],
-                                "name": row["name"],
-                                "severity": row["severity"],
-                                "quantity_delta": row["quantity_delta"],
-                                "created_at": str(row["created_at"]),
-                            }
-                            for row in fallback
-                        ]
+                    "content": (
+                        f"Provide a concise reorder reason per item: {reorder_json}\n"
+                        f"Explain each stock movement anomaly and suggest an action: "
+                        f"{_anomaly_payload_json(anomaly_rows)}"
                     ),
                 },
             ],
         )
 
-        parsed = _extract_json_object(getattr(response, "output_text", ""))
-        note_map = parsed.get("notes", {}) if parsed else {}
-        if isinstance(note_map, dict):
-            for row in fallback:
-                node = note_map.get(str(row["item_id"]))
-                if isinstance(node, dict):
-                    explanation = node.get("explanation")
-                    action = node.get("action")
-                    if isinstance(explanation, str) and explanation.strip():
-                        row["explanation"] = explanation.strip()
-                    if isinstance(action, str) and action.strip():
-                        row["suggested_action"] = action.strip()
-
-        return {"source": "ai", "model": model, "alerts": fallback}
+        parsed = _parse_json_output(response)
+        if not parsed:
+            return fallback
+        reason_map = parsed.get("reasons", {})
+        if isinstance(reason_map, dict):
+            _REORDER_REASON_CACHE.set(reason_cache_key, reason_map)
+        _apply_reorder_reasons(reorder_rows, reason_map)
+        _apply_anomaly_notes(anomaly_rows, parsed.get("notes", {}))
+
+        return {
+            "reorder": {"source": "ai", "model": model, "suggestions": reorder_rows},
+            "anomalies": {"source": "ai", "model": model, "alerts": anomaly_rows},
+        }
     except Exception:
-        return {"source": "fallback", "model": None, "alerts": fallback}
+        return fallback
+
+
+_CATEGORY_RE = re.compile(r"category\s*[:=]\s*([a-zA-Z0-9\-\s]+)", re.IGNORECASE)
+_UNDER_RE = re.compile(r"(?:under|below|less than)\s+(\d+)")
+_ABOVE_RE = re.compile(r"(?:above|over|more than)\s+(\d+)")
+# Listed in match priority: when a query mentions several, the earliest phrase here wins.
+_STATUS_PHRASES = {
+    "in stock": ItemStatus.IN_STOCK.value,
+    "low stock": ItemStatus.LOW_STOCK.value,
+    "ordered": ItemStatus.ORDERED.value,
+    "discontinued": ItemStatus.DISCONTINUED.value,
+}
+_STATUS_RE = re.compile("|".join(re.escape(phrase) for phrase in _STATUS_PHRASES))
 
 
 def parse_natural_language_filters(query: str) -> dict[str, object]:
@@ -230,24 +498,20 @@ def parse_natural_language_filters(query: str) -> dict[str, object]:
         "sort_dir": "desc",
     }
 
-    category_match = re.search(r"category\s*[:=]\s*([a-zA-Z0-9\-\s]+)", normalized, re.IGNORECASE)
+    category_match = _CATEGORY_RE.search(normalized)
     if category_match:
         fallback["category"] = category_match.group(1).strip()
 
     lowered = normalized.lower()
-    status_map = {
-        "in stock": ItemStatus.IN_STOCK.value,
-        "low stock": ItemStatus.LOW_STOCK.value,
-        "ordered": ItemStatus.ORDERED.value,
-        "discontinued": ItemStatus.DISCONTINUED.value,
-    }
-    for phrase, status in status_map.items():
-        if phrase in lowered:
+    # One scan for every status phrase, then the (at most four) hits resolved by priority.
+    mentioned = set(_STATUS_RE.findall(lowered))
+    for phrase, status in _STATUS_PHRASES.items():
+        if phrase in mentioned:
             fallback["status"] = status
             break
 
-    under_match = re.search(r"(?:under|below|less than)\s+(\d+)", lowered)
-    above_match = re.search(r"(?:above|over|more than)\s+(\d+)", lowered)
+    under_match = _UNDER_RE.search(lowered)
+    above_match = _ABOVE_RE.search(lowered)
     if under_match:
         fallback["max_qty"] = int(under_match.group(1))
     if above_match:
@@ -259,9 +523,17 @@ def parse_natural_language_filters(query: str) -> dict[str, object]:
         fallback["model"] = None
         return fallback
 
+    cache_key = (model, normalized)
+    cached = _NL_FILTER_CACHE.get(cache_key)
+    if cached is not None:
+        return dict(cached)  # type: ignore[call-overload]
+
     try:
-        response = client.responses.create(  # type: ignore[union-attr]
+        response = _create_response(
+            client,
             model=model,
+            max_output_tokens=_FILTERS_MAX_OUTPUT_TOKENS,
+            text=_NL_FILTERS_FORMAT,
             input=[
                 {
                     "role": "system",
@@ -274,7 +546,7 @@ def parse_natural_language_filters(query: str) -> dict[str, object]:
             ],
         )
 
-        parsed = _extract_json_object(getattr(response, "output_text", ""))
+        parsed = _parse_json_output(response)
         if not parsed:
             fallback["source"] = "fallback"
             fallback["model"] = None
@@ -289,6 +561,7 @@ def parse_natural_language_filters(query: str) -> dict[str, object]:
 
         merged["source"] = "ai"
         merged["model"] = model
+        _NL_FILTER_CACHE.set(cache_key, dict(merged))
         return merged
     except Exception:
         fallback["source"] = "fallback"
@@ -297,4 +570,5 @@ def parse_natural_language_filters(query: str) -> dict[str, object]:
 
 
 def make_ai_note_timestamp() -> str:
-    return datetime.utcnow().isoformat() + "Z"
+    # Aware now() instead of the deprecated utcnow(); same "...T12:34:56.789012Z" shape as before.
+    return datetime.now(timezone.utc).isoformat(timespec="microseconds").replace("+00:00", "Z")
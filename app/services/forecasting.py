@@ -5,9 +5,19 @@ from datetime import date, timedelta
 
 import numpy as np
 import pandas as pd
-from sklearn.ensemble import GradientBoostingRegressor
+from sklearn.ensemble import HistGradientBoostingRegressor
 
 LAG_FEATURES = [1, 2, 3, 7, 14, 28]
+ROLLING_WINDOW = 7
+FEATURE_FRAME_COLUMNS = [
+    "y",
+    *(f"lag_{lag}" for lag in LAG_FEATURES),
+    "rolling_mean_7",
+    "rolling_std_7",
+    "dow",
+    "month",
+    "trend",
+]
 P10_Z = -1.2815515655446004
 P90_Z = 1.2815515655446004
 
@@ -28,25 +38,31 @@ def demand_series_from_transactions(
     if not transactions:
         return pd.Series(dtype=float)
 
-    records: list[tuple[pd.Timestamp, float]] = []
+    ordinals: list[int] = []
+    quantities: list[float] = []
     for tx in transactions:
         tx_type = str(getattr(tx, "transaction_type", "")).upper()
         # Demand should only include outbound fulfillment, not adjustments.
         if tx_type == "OUTBOUND" and getattr(tx, "quantity_delta", 0) < 0:
-            tx_date = pd.Timestamp(getattr(tx, "created_at").date())
-            records.append((tx_date, float(abs(getattr(tx, "quantity_delta")))))
+            ordinals.append(getattr(tx, "created_at").date().toordinal())
+            quantities.append(float(abs(getattr(tx, "quantity_delta"))))
 
-    if not records:
+    if not ordinals:
         return pd.Series(dtype=float)
 
-    frame = pd.DataFrame(records, columns=["date", "demand"])
-    grouped = frame.groupby("date", as_index=True)["demand"].sum().sort_index()
+    days = np.array(ordinals, dtype=np.int64)
+    demand = np.array(quantities, dtype=np.float64)
 
-    end_date = pd.Timestamp.today().normalize()
-    start_date = max(grouped.index.min(), end_date - pd.Timedelta(days=days_lookback))
-    full_range = pd.date_range(start=start_date, end=end_date, freq="D")
+    end_ordinal = pd.Timestamp.today().normalize().toordinal()
+    start_ordinal = max(int(days.min()), end_ordinal - days_lookback)
+    length = max(end_ordinal - start_ordinal + 1, 0)
 
-    return grouped.reindex(full_range, fill_value=0.0).astype(float)
+    # Daily totals summed straight into the dense window; days outside it are dropped as reindex() did.
+    in_window = (days >= start_ordinal) & (days <= end_ordinal)
+    totals = np.bincount(days[in_window] - start_ordinal, weights=demand[in_window], minlength=length)
+
+    full_range = pd.date_range(start=date.fromordinal(start_ordinal), periods=length, freq="D")
+    return pd.Series(totals, index=full_range, name="demand", dtype=float)
 
 
 def generate_forecast(
@@ -78,19 +94,31 @@ def generate_forecast(
 
 
 def _build_feature_frame(series: pd.Series) -> tuple[bool, pd.DataFrame]:
-    frame = pd.DataFrame(index=series.index)
-    frame["y"] = series.values
-
-    for lag in LAG_FEATURES:
-        frame[f"lag_{lag}"] = frame["y"].shift(lag)
-
-    frame["rolling_mean_7"] = frame["y"].shift(1).rolling(window=7).mean()
-    frame["rolling_std_7"] = frame["y"].shift(1).rolling(window=7).std().fillna(0.0)
-    frame["dow"] = frame.index.dayofweek
-    frame["month"] = frame.index.month
-    frame["trend"] = np.arange(len(frame), dtype=float)
-
-    frame = frame.dropna()
+    values = series.to_numpy(dtype=float)
+    # Rows before the longest lag have missing features and are dropped, as dropna() used to.
+    start = max(max(LAG_FEATURES), ROLLING_WINDOW)
+    rows = max(len(values) - start, 0)
+
+    # One preallocated block filled column by column from views of `values`, instead of a pandas
+    # shift()/rolling() allocation per feature.
+    block = np.empty((rows, len(FEATURE_FRAME_COLUMNS)), dtype=float)
+    if rows:
+        end = len(values)
+        block[:, 0] = values[start:]
+        for column, lag in enumerate(LAG_FEATURES, start=1):
+            block[:, column] = values[start - lag : end - lag]
+
+        # Window i covers values[i:i + 7], the seven days before row i + 7 (shift(1).rolling(7)).
+        windows = np.lib.stride_tricks.sliding_window_view(values[:-1], ROLLING_WINDOW)
+        windows = windows[start - ROLLING_WINDOW : end - ROLLING_WINDOW]
+        rolling_column = len(LAG_FEATURES) + 1
+        block[:, rolling_column] = windows.mean(axis=1)
+        block[:, rolling_column + 1] = windows.std(axis=1, ddof=1)
+        block[:, rolling_column + 2] = series.index.dayofweek[start:]
+        block[:, rolling_column + 3] = series.index.month[start:]
+        block[:, rolling_column + 4] = np.arange(start, end, dtype=float)
+
+    frame = pd.DataFrame(block, index=series.index[start:], columns=FEATURE_FRAME_COLUMNS)
     return not frame.empty, frame
 
 
@@ -99,22 +127,27 @@ def _gradient_boosted_forecast(
     feature_frame: pd.DataFrame,
     horizon_days: int,
 ) -> ForecastResult:
-    target = feature_frame["y"]
-    features = feature_frame.drop(columns=["y"])
+    # Plain arrays throughout, so the per-step prediction rows below need no feature names.
+    target = feature_frame["y"].to_numpy()
+    features = feature_frame.drop(columns=["y"]).to_numpy()
 
     holdout = max(7, min(14, len(features) // 5))
     if len(features) <= holdout + 10:
         return _weighted_average_forecast(series, horizon_days)
 
-    x_train, x_test = features.iloc[:-holdout], features.iloc[-holdout:]
-    y_train, y_test = target.iloc[:-holdout], target.iloc[-holdout:]
+    x_train, x_test = features[:-holdout], features[-holdout:]
+    y_train, y_test = target[:-holdout], target[-holdout:]
 
-    model = GradientBoostingRegressor(
+    # Histogram-binned boosting trains far faster than GradientBoostingRegressor on these few hundred rows,
+    # and early stopping on an internal validation split usually ends well short of max_iter.
+    model = HistGradientBoostingRegressor(
         random_state=42,
-        n_estimators=300,
+        max_iter=300,
         learning_rate=0.05,
         max_depth=3,
         loss="squared_error",
+        early_stopping=True,
+        validation_fraction=0.1,
     )
     model.fit(x_train, y_train)
 
@@ -126,12 +159,28 @@ def _gradient_boosted_forecast(
     sigma = float(np.std(residuals, ddof=1)) if len(residuals) > 1 else float(series.std())
     sigma = max(sigma, 0.1)
 
-    history_series = series.copy()
+    # Features only look back max(LAG_FEATURES) days, so keep just that tail of the observed demand
+    # followed by the forecasts so far; history_len and history_total track the full history.
+    lookback = max(LAG_FEATURES)
+    observed = series.to_numpy(dtype=float)
+    filled = min(len(observed), lookback)
+    recent_values = np.empty(filled + horizon_days, dtype=np.float64)
+    recent_values[:filled] = observed[-filled:]
+    history_len = len(observed)
+    history_total = float(observed.sum())
+    last_date = series.index[-1]
     forecast_rows: list[dict[str, float | date]] = []
+    feature_row = np.empty((1, features.shape[1]), dtype=np.float64)
 
     for step in range(1, horizon_days + 1):
-        next_date = history_series.index[-1] + timedelta(days=1)
-        feature_row = _feature_row_from_history(history_series, next_date)
+        next_date = last_date + timedelta(days=step)
+        _feature_row_from_history(
+            recent_values[max(filled - lookback, 0) : filled],
+            history_len,
+            history_total / history_len,
+            next_date,
+            feature_row,
+        )
         point_forecast = float(max(model.predict(feature_row)[0], 0.0))
 
         uncertainty = sigma * np.sqrt(step)
@@ -147,7 +196,10 @@ def _gradient_boosted_forecast(
             }
         )
 
-        history_series.loc[next_date] = point_forecast
+        recent_values[filled] = point_forecast
+        filled += 1
+        history_len += 1
+        history_total += point_forecast
 
     history = [
         {"date": idx.date().isoformat(), "demand": float(value)}
@@ -164,24 +216,26 @@ def _gradient_boosted_forecast(
     )
 
 
-def _feature_row_from_history(history: pd.Series, next_date: pd.Timestamp) -> pd.DataFrame:
-    features: dict[str, float] = {}
-
-    history_mean = float(history.mean()) if len(history) > 0 else 0.0
-    for lag in LAG_FEATURES:
-        if len(history) >= lag:
-            features[f"lag_{lag}"] = float(history.iloc[-lag])
-        else:
-            features[f"lag_{lag}"] = history_mean
-
-    window = history.tail(7)
-    features["rolling_mean_7"] = float(window.mean()) if not window.empty else history_mean
-    features["rolling_std_7"] = float(window.std(ddof=0)) if len(window) > 1 else 0.0
-    features["dow"] = float(next_date.dayofweek)
-    features["month"] = float(next_date.month)
-    features["trend"] = float(len(history))
-
-    return pd.DataFrame([features])
+def _feature_row_from_history(
+    recent: np.ndarray,
+    history_len: int,
+    history_mean: float,
+    next_date: pd.Timestamp,
+    row: np.ndarray,
+) -> np.ndarray:
+    # `recent` is the last min(history_len, max(LAG_FEATURES)) values of the history. Fills `row`
+    # (shape (1, features), FEATURE_FRAME_COLUMNS order without "y") in place and returns it.
+    for column, lag in enumerate(LAG_FEATURES):
+        row[0, column] = recent[-lag] if history_len >= lag else history_mean
+
+    column = len(LAG_FEATURES)
+    window = recent[-ROLLING_WINDOW:]
+    row[0, column] = window.mean() if len(window) > 0 else history_mean
+    row[0, column + 1] = window.std(ddof=0) if len(window) > 1 else 0.0
+    row[0, column + 2] = next_date.dayofweek
+    row[0, column + 3] = next_date.month
+    row[0, column + 4] = history_len
+    return row
 
 
 def _weighted_average_forecast(series: pd.Series, horizon_days: int) -> ForecastResult:
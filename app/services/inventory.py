@@ -1,8 +1,16 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from math import ceil, sqrt
 from statistics import NormalDist
 
+import numpy as np
+
+
+@lru_cache(maxsize=64)
+def _z_value(service_level: float) -> float:
+    return NormalDist().inv_cdf(service_level)
+
 
 def calculate_reorder_policy(
     on_hand: int,
@@ -18,7 +26,8 @@ def calculate_reorder_policy(
     review_period_days = max(1, review_period_days)
     service_level = min(max(service_level, 0.5), 0.999)
 
-    z_value = NormalDist().inv_cdf(service_level)
+    # Rounded so equal service levels from different float arithmetic share one cache entry.
+    z_value = _z_value(round(service_level, 4))
     model_safety_stock = z_value * daily_std * sqrt(lead_time_days)
 
     if safety_stock_override is not None:
@@ -51,3 +60,56 @@ def calculate_reorder_policy(
         "recommended_order_qty": int(recommended_order_qty),
         "stockout_risk": stockout_risk,
     }
+
+
+def calculate_reorder_policy_batch(
+    on_hand: np.ndarray,
+    lead_time_days: np.ndarray,
+    service_level: float,
+    daily_forecast_p50: np.ndarray,
+    daily_std: np.ndarray,
+    review_period_days: int | np.ndarray = 7,
+    min_order_qty: int | np.ndarray = 0,
+    safety_stock_override: np.ndarray | None = None,
+) -> dict[str, np.ndarray]:
+    # calculate_reorder_policy over aligned 1D arrays (one element per item); same keys, array values.
+    on_hand = np.asarray(on_hand, dtype=np.int64)
+    lead_time_days = np.maximum(np.asarray(lead_time_days, dtype=np.int64), 1)
+    review_period_days = np.maximum(np.asarray(review_period_days, dtype=np.int64), 1)
+    min_order_qty = np.asarray(min_order_qty, dtype=np.int64)
+    daily_forecast_p50 = np.asarray(daily_forecast_p50, dtype=np.float64)
+    daily_std = np.asarray(daily_std, dtype=np.float64)
+    service_level = min(max(service_level, 0.5), 0.999)
+
+    z_value = _z_value(round(service_level, 4))
+    safety_stock = z_value * daily_std * np.sqrt(lead_time_days)
+    if safety_stock_override is not None:
+        # fmax ignores NaN, so items without an override keep the model value.
+        safety_stock = np.fmax(np.asarray(safety_stock_override, dtype=np.float64), safety_stock)
+
+    reorder_point = (daily_forecast_p50 * lead_time_days) + safety_stock
+    target_stock = reorder_point + (daily_forecast_p50 * review_period_days)
+
+    recommended_order_qty = np.maximum(np.ceil(target_stock - on_hand), 0).astype(np.int64)
+    rounds_up = (recommended_order_qty > 0) & (min_order_qty > 0)
+    order_multiple = np.maximum(min_order_qty, 1)
+    recommended_order_qty = np.where(
+        rounds_up,
+        np.ceil(recommended_order_qty / order_multiple).astype(np.int64) * order_multiple,
+        recommended_order_qty,
+    )
+
+    stockout_risk = np.select(
+        [on_hand <= reorder_point * 0.5, on_hand <= reorder_point], ["HIGH", "MEDIUM"], default="LOW"
+    )
+
+    return {
+        "on_hand": on_hand,
+        "lead_time_days": lead_time_days,
+        "forecast_daily_p50": np.round(daily_forecast_p50, 3),
+        "safety_stock": np.rint(safety_stock).astype(np.int64),
+        "reorder_point": np.rint(reorder_point).astype(np.int64),
+        "target_stock": np.rint(target_stock).astype(np.int64),
+        "recommended_order_qty": recommended_order_qty,
+        "stockout_risk": stockout_risk,
+    }
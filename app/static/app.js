@@ -655,7 +655,67 @@ async function runStandardSearch() {
 }
 
 async function loadAiPanels() {
-  await Promise.all([loadReorderSuggestions(), loadAnomalyAlerts()]);
+  // One request (and one model call) fills both panels; the refresh buttons reload them separately.
+  show(els.reorderLoading);
+  show(els.anomalyLoading);
+  hide(els.reorderError);
+  hide(els.anomalyError);
+
+  try {
+    const response = await api("/api/ai/insights?reorder_limit=25&days=30&anomaly_limit=20");
+    renderReorderSuggestions(response.reorder);
+    renderAnomalyAlerts(response.anomalies);
+  } catch (error) {
+    els.reorderError.textContent = `${error.message}. Click refresh to retry.`;
+    els.anomalyError.textContent = `${error.message}. Click refresh to retry.`;
+    show(els.reorderError);
+    show(els.anomalyError);
+  } finally {
+    hide(els.reorderLoading);
+    hide(els.anomalyLoading);
+  }
+}
+
+function renderReorderSuggestions(response) {
+  els.reorderSource.textContent = `Source: ${response.source}${response.model ? ` (${response.model})` : ""}`;
+
+  els.reorderBody.innerHTML = "";
+  if (response.suggestions.length === 0) {
+    els.reorderBody.innerHTML = '<tr><td colspan="6">No reorder actions needed right now.</td></tr>';
+    return;
+  }
+  for (const suggestion of response.suggestions) {
+    const tr = document.createElement("tr");
+    tr.innerHTML = `
+      <td>${suggestion.sku}</td>
+      <td>${suggestion.name}</td>
+      <td>${suggestion.current_quantity}</td>
+      <td>${suggestion.reorder_threshold}</td>
+      <td>${suggestion.recommended_order_qty}</td>
+      <td>${suggestion.reason}</td>
+    `;
+    els.reorderBody.appendChild(tr);
+  }
+}
+
+function renderAnomalyAlerts(response) {
+  els.anomalySource.textContent = `Source: ${response.source}${response.model ? ` (${response.model})` : ""}`;
+
+  els.anomalyList.innerHTML = "";
+  if (response.alerts.length === 0) {
+    els.anomalyList.innerHTML = "<li>No anomalies detected in selected window.</li>";
+    return;
+  }
+  for (const alert of response.alerts) {
+    const li = document.createElement("li");
+    li.innerHTML = `
+      <strong>${alert.sku} • ${alert.severity.toUpperCase()}</strong><br/>
+      <span class="muted">${new Date(alert.created_at).toLocaleString()} • Delta ${alert.quantity_delta}</span><br/>
+      ${alert.explanation}<br/>
+      <em>${alert.suggested_action}</em>
+    `;
+    els.anomalyList.appendChild(li);
+  }
 }
 
 async function loadReorderSuggestions() {
@@ -664,26 +724,7 @@ async function loadReorderSuggestions() {
   setButtonBusy(els.refreshReorderBtn, true, "Refresh", "Refreshing...");
 
   try {
-    const response = await api("/api/ai/reorder-suggestions?limit=25");
-    els.reorderSource.textContent = `Source: ${response.source}${response.model ? ` (${response.model})` : ""}`;
-
-    els.reorderBody.innerHTML = "";
-    if (response.suggestions.length === 0) {
-      els.reorderBody.innerHTML = '<tr><td colspan="6">No reorder actions needed right now.</td></tr>';
-    } else {
-      for (const suggestion of response.suggestions) {
-        const tr = document.createElement("tr");
-        tr.innerHTML = `
-          <td>${suggestion.sku}</td>
-          <td>${suggestion.name}</td>
-          <td>${suggestion.current_quantity}</td>
-          <td>${suggestion.reorder_threshold}</td>
-          <td>${suggestion.recommended_order_qty}</td>
-          <td>${suggestion.reason}</td>
-        `;
-        els.reorderBody.appendChild(tr);
-      }
-    }
+    renderReorderSuggestions(await api("/api/ai/reorder-suggestions?limit=25"));
   } catch (error) {
     els.reorderError.textContent = `${error.message}. Click refresh to retry.`;
     show(els.reorderError);
@@ -699,24 +740,7 @@ async function loadAnomalyAlerts() {
   setButtonBusy(els.refreshAnomalyBtn, true, "Refresh", "Refreshing...");
 
   try {
-    const response = await api("/api/ai/anomaly-alerts?days=30&limit=20");
-    els.anomalySource.textContent = `Source: ${response.source}${response.model ? ` (${response.model})` : ""}`;
-
-    els.anomalyList.innerHTML = "";
-    if (response.alerts.length === 0) {
-      els.anomalyList.innerHTML = "<li>No anomalies detected in selected window.</li>";
-    } else {
-      for (const alert of response.alerts) {
-        const li = document.createElement("li");
-        li.innerHTML = `
-          <strong>${alert.sku} • ${alert.severity.toUpperCase()}</strong><br/>
-          <span class="muted">${new Date(alert.created_at).toLocaleString()} • Delta ${alert.quantity_delta}</span><br/>
-          ${alert.explanation}<br/>
-          <em>${alert.suggested_action}</em>
-        `;
-        els.anomalyList.appendChild(li);
-      }
-    }
+    renderAnomalyAlerts(await api("/api/ai/anomaly-alerts?days=30&limit=20"));
   } catch (error) {
     els.anomalyError.textContent = `${error.message}. Click refresh to retry.`;
     show(els.anomalyError);
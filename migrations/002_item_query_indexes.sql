@@ -0,0 +1,5 @@
+-- Indexes backing the item list/search query shapes in app/main.py.
+-- Fresh databases get these from Base.metadata.create_all; apply this file to existing ones.
+
+CREATE INDEX IF NOT EXISTS ix_items_active_updated_at ON items (updated_at) WHERE is_deleted IS 0;
+CREATE INDEX IF NOT EXISTS ix_items_category_status ON items (category, status);
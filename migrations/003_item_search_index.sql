@@ -0,0 +1,25 @@
+-- SQLite FTS5 trigram index behind item search in app/main.py.
+-- Fresh databases get this from the items table create hook in app/models.py; apply this file to existing ones.
+
+CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(
+    name, sku, category, details, content='items', content_rowid='id', tokenize='trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS items_fts_ai AFTER INSERT ON items BEGIN
+    INSERT INTO items_fts(rowid, name, sku, category, details)
+    VALUES (new.id, new.name, new.sku, new.category, new.details);
+END;
+
+CREATE TRIGGER IF NOT EXISTS items_fts_ad AFTER DELETE ON items BEGIN
+    INSERT INTO items_fts(items_fts, rowid, name, sku, category, details)
+    VALUES ('delete', old.id, old.name, old.sku, old.category, old.details);
+END;
+
+CREATE TRIGGER IF NOT EXISTS items_fts_au AFTER UPDATE OF name, sku, category, details ON items BEGIN
+    INSERT INTO items_fts(items_fts, rowid, name, sku, category, details)
+    VALUES ('delete', old.id, old.name, old.sku, old.category, old.details);
+    INSERT INTO items_fts(rowid, name, sku, category, details)
+    VALUES (new.id, new.name, new.sku, new.category, new.details);
+END;
+
+INSERT INTO items_fts(items_fts) VALUES ('rebuild');
@@ -0,0 +1,5 @@
+-- Composite index behind per-item event history and the anomaly window join in app/main.py.
+-- Fresh databases get this from Base.metadata.create_all; apply this file to existing ones.
+
+CREATE INDEX IF NOT EXISTS ix_quantity_events_item_created_at ON quantity_events (item_id, created_at);
+DROP INDEX IF EXISTS ix_quantity_events_item_id;
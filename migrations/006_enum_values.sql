@@ -0,0 +1,8 @@
+-- Enum columns now store their values ('in_stock'), matching 001_schema.sql, instead of member names ('IN_STOCK').
+-- The app applies the same upgrade on startup; apply this file to existing SQLite databases otherwise.
+-- On PostgreSQL the columns were native ENUM types; startup converts them instead, with
+-- ALTER COLUMN ... TYPE VARCHAR USING lower(column::text) followed by DROP TYPE.
+
+UPDATE users SET role = lower(role) WHERE role <> lower(role);
+UPDATE items SET status = lower(status) WHERE status <> lower(status);
+UPDATE quantity_events SET event_type = lower(event_type) WHERE event_type <> lower(event_type);
@@ -0,0 +1,5 @@
+-- Composite index behind filtered item listings in app/main.py; supersedes ix_items_category_status.
+-- Fresh databases get this from Base.metadata.create_all; apply this file to existing ones.
+
+CREATE INDEX IF NOT EXISTS ix_items_list_hot ON items (is_deleted, lower(category), status, updated_at);
+DROP INDEX IF EXISTS ix_items_category_status;
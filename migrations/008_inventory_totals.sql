@@ -0,0 +1,76 @@
+-- Single-row dashboard counters behind /api/dashboard in app/main.py, kept current by triggers on items.
+-- Fresh databases get this from Base.metadata.create_all and the hook in app/models.py; apply this file to
+-- existing SQLite ones after 006_enum_values.sql.
+
+CREATE TABLE IF NOT EXISTS inventory_totals (
+    id INTEGER NOT NULL PRIMARY KEY,
+    total_items INTEGER NOT NULL,
+    active_items INTEGER NOT NULL,
+    low_stock_alerts INTEGER NOT NULL,
+    total_quantity INTEGER NOT NULL,
+    total_inventory_value FLOAT NOT NULL
+);
+
+CREATE TRIGGER IF NOT EXISTS items_totals_ai AFTER INSERT ON items BEGIN
+    UPDATE inventory_totals SET
+        total_items = total_items + 1,
+        active_items = active_items + CASE WHEN new.is_deleted THEN 0 ELSE 1 END,
+        low_stock_alerts = low_stock_alerts + (CASE WHEN new.is_deleted THEN 0
+            WHEN new.status IN ('low_stock', 'ordered')
+                OR (new.status <> 'discontinued' AND new.quantity <= new.reorder_threshold) THEN 1 ELSE 0 END),
+        total_quantity = total_quantity + CASE WHEN new.is_deleted THEN 0 ELSE 1 END * new.quantity,
+        total_inventory_value = total_inventory_value
+            + CASE WHEN new.is_deleted THEN 0 ELSE 1 END * new.quantity * new.unit_cost
+    WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS items_totals_ad AFTER DELETE ON items BEGIN
+    UPDATE inventory_totals SET
+        total_items = total_items - 1,
+        active_items = active_items - CASE WHEN old.is_deleted THEN 0 ELSE 1 END,
+        low_stock_alerts = low_stock_alerts - (CASE WHEN old.is_deleted THEN 0
+            WHEN old.status IN ('low_stock', 'ordered')
+                OR (old.status <> 'discontinued' AND old.quantity <= old.reorder_threshold) THEN 1 ELSE 0 END),
+        total_quantity = total_quantity - CASE WHEN old.is_deleted THEN 0 ELSE 1 END * old.quantity,
+        total_inventory_value = total_inventory_value
+            - CASE WHEN old.is_deleted THEN 0 ELSE 1 END * old.quantity * old.unit_cost
+    WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS items_totals_au
+AFTER UPDATE OF quantity, reorder_threshold, unit_cost, status, is_deleted ON items BEGIN
+    UPDATE inventory_totals SET
+        total_items = total_items - 1,
+        active_items = active_items - CASE WHEN old.is_deleted THEN 0 ELSE 1 END,
+        low_stock_alerts = low_stock_alerts - (CASE WHEN old.is_deleted THEN 0
+            WHEN old.status IN ('low_stock', 'ordered')
+                OR (old.status <> 'discontinued' AND old.quantity <= old.reorder_threshold) THEN 1 ELSE 0 END),
+        total_quantity = total_quantity - CASE WHEN old.is_deleted THEN 0 ELSE 1 END * old.quantity,
+        total_inventory_value = total_inventory_value
+            - CASE WHEN old.is_deleted THEN 0 ELSE 1 END * old.quantity * old.unit_cost
+    WHERE id = 1;
+    UPDATE inventory_totals SET
+        total_items = total_items + 1,
+        active_items = active_items + CASE WHEN new.is_deleted THEN 0 ELSE 1 END,
+        low_stock_alerts = low_stock_alerts + (CASE WHEN new.is_deleted THEN 0
+            WHEN new.status IN ('low_stock', 'ordered')
+                OR (new.status <> 'discontinued' AND new.quantity <= new.reorder_threshold) THEN 1 ELSE 0 END),
+        total_quantity = total_quantity + CASE WHEN new.is_deleted THEN 0 ELSE 1 END * new.quantity,
+        total_inventory_value = total_inventory_value
+            + CASE WHEN new.is_deleted THEN 0 ELSE 1 END * new.quantity * new.unit_cost
+    WHERE id = 1;
+END;
+
+DELETE FROM inventory_totals;
+INSERT INTO inventory_totals
+    (id, total_items, active_items, low_stock_alerts, total_quantity, total_inventory_value)
+SELECT
+    1,
+    count(*),
+    coalesce(sum(CASE WHEN is_deleted THEN 0 ELSE 1 END), 0),
+    coalesce(sum(CASE WHEN is_deleted THEN 0
+        WHEN status IN ('low_stock', 'ordered')
+            OR (status <> 'discontinued' AND quantity <= reorder_threshold) THEN 1 ELSE 0 END), 0),
+    coalesce(sum(CASE WHEN is_deleted THEN 0 ELSE 1 END * quantity), 0),
+    coalesce(sum(CASE WHEN is_deleted THEN 0 ELSE 1 END * quantity * unit_cost), 0.0)
+FROM items;
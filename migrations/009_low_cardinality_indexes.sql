@@ -0,0 +1,7 @@
+-- Replaces the full indexes on items.status and users.role with a partial index for the
+-- low-stock listing in app/main.py. Fresh databases get this from Base.metadata.create_all;
+-- apply this file to existing SQLite ones.
+
+DROP INDEX IF EXISTS ix_items_status;
+DROP INDEX IF EXISTS ix_users_role;
+CREATE INDEX IF NOT EXISTS ix_items_low_stock ON items (updated_at) WHERE status = 'low_stock' AND is_deleted IS 0;
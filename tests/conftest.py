@@ -1,59 +1,103 @@
+from collections.abc import Callable, Generator
 import os
 from pathlib import Path
 import sys
 
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, sessionmaker
 
-os.environ["DATABASE_URL"] = "sqlite:///./test_ims.db"
+# In-memory, so commits never touch the filesystem; app/database.py pins it to a single connection.
+os.environ["DATABASE_URL"] = "sqlite://"
 os.environ["AUTH_PASSWORD_PEPPER"] = "test-pepper"
+# The lowest count app/auth.py accepts: same PBKDF2 code path, half the hashing time of the default.
+os.environ["AUTH_PASSWORD_ITERATIONS"] = "100000"
 
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from app.database import Base, engine  # noqa: E402
+from app.database import Base, engine, get_db  # noqa: E402
 from app.main import app  # noqa: E402
+from app.models import Item  # noqa: E402
 from app.seed import run_seed  # noqa: E402
 
 
-@pytest.fixture(autouse=True)
-def reset_db() -> None:
+@pytest.fixture(scope="session", autouse=True)
+def seeded_db() -> None:
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
     run_seed()
 
 
-@pytest.fixture
-def client() -> TestClient:
-    return TestClient(app)
+@pytest.fixture(autouse=True)
+def db_connection(seeded_db: None) -> Generator[Connection, None, None]:
+    # Each test runs inside one outer transaction that is rolled back afterwards, so the seeded
+    # database is built once per session. Route commits only release savepoints inside it.
+    connection = engine.connect()
+    transaction = connection.begin()
+    # pysqlite defers BEGIN until the first write; open the outer transaction explicitly so the
+    # route savepoints always nest inside it rather than starting (and committing) their own.
+    connection.exec_driver_sql("BEGIN")
+    test_session = sessionmaker(
+        bind=connection,
+        autoflush=False,
+        expire_on_commit=False,
+        join_transaction_mode="create_savepoint",
+    )
+
+    def get_test_db() -> Generator[Session, None, None]:
+        with test_session() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = get_test_db
+    try:
+        yield connection
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        transaction.rollback()
+        connection.close()
 
 
 @pytest.fixture
-def manager_headers(client: TestClient) -> dict[str, str]:
-    response = client.post(
-        "/api/auth/login",
-        json={"username": "manager", "password": "manager123"},
-    )
+def make_item(db_connection: Connection) -> Callable[..., int]:
+    # Throwaway rows for tests that only need something to mutate: one INSERT on the test
+    # connection instead of a POST /api/items round trip with its audit row.
+    def _make_item(sku: str, **values: object) -> int:
+        with Session(bind=db_connection, join_transaction_mode="create_savepoint", expire_on_commit=False) as db:
+            item = Item(sku=sku, name=sku, category="Testing", **values)
+            db.add(item)
+            db.commit()
+            return item.id
+
+    return _make_item
+
+
+@pytest.fixture(scope="session")
+def client(seeded_db: None) -> Generator[TestClient, None, None]:
+    # One client (and one app startup) for the whole run; per-test isolation comes from db_connection.
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def _login_headers(client: TestClient, username: str, password: str) -> dict[str, str]:
+    response = client.post("/api/auth/login", json={"username": username, "password": password})
     assert response.status_code == 200
     return {"X-API-Key": response.json()["api_key"]}
 
 
-@pytest.fixture
+# API keys are seeded per user and login does not write, so the headers stay valid across tests.
+@pytest.fixture(scope="session")
+def manager_headers(client: TestClient) -> dict[str, str]:
+    return _login_headers(client, "manager", "manager123")
+
+
+@pytest.fixture(scope="session")
 def viewer_headers(client: TestClient) -> dict[str, str]:
-    response = client.post(
-        "/api/auth/login",
-        json={"username": "viewer", "password": "viewer123"},
-    )
-    assert response.status_code == 200
-    return {"X-API-Key": response.json()["api_key"]}
+    return _login_headers(client, "viewer", "viewer123")
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def admin_headers(client: TestClient) -> dict[str, str]:
-    response = client.post(
-        "/api/auth/login",
-        json={"username": "admin", "password": "admin123"},
-    )
-    assert response.status_code == 200
-    return {"X-API-Key": response.json()["api_key"]}
+    return _login_headers(client, "admin", "admin123")
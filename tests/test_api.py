@@ -1,3 +1,16 @@
+import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import delete, event, insert, select, text
+
+from app import main
+from app.database import engine
+from app.models import AuditLog, InventoryTotals, Item, ItemStatus
+from app.services import ai_features
+
+
 def test_login_and_me(client):
     login = client.post("/api/auth/login", json={"username": "admin", "password": "admin123"})
     assert login.status_code == 200
@@ -26,9 +39,7 @@ def test_viewer_is_read_only(client, viewer_headers):
     assert response.status_code == 403
 
 
-def test_manager_can_crud_and_writes_audit(client, manager_headers):
-    before_logs = client.get("/api/audit", headers=manager_headers).json()
-
+def test_manager_can_crud_and_writes_audit(client, manager_headers, db_connection):
     created = client.post(
         "/api/items",
         headers=manager_headers,
@@ -65,8 +76,13 @@ def test_manager_can_crud_and_writes_audit(client, manager_headers):
     deleted = client.delete(f"/api/items/{item_id}", headers=manager_headers)
     assert deleted.status_code == 200
 
-    after_logs = client.get("/api/audit", headers=manager_headers).json()
-    assert len(after_logs) > len(before_logs)
+    # Read the item's audit trail straight from SQL rather than paging through /api/audit.
+    actions = db_connection.scalars(
+        select(AuditLog.action)
+        .where(AuditLog.entity_type == "item", AuditLog.entity_id == item_id)
+        .order_by(AuditLog.id)
+    ).all()
+    assert actions == ["ITEM_CREATE", "ITEM_UPDATE", "ITEM_STATUS_UPDATE", "ITEM_DELETE"]
 
 
 def test_search_by_name_category_status(client, viewer_headers):
@@ -78,31 +94,72 @@ def test_search_by_name_category_status(client, viewer_headers):
     assert response.status_code == 200
     payload = response.json()
     assert payload["total"] >= 1
-    assert any(item["name"] == "27-inch Monitor" for item in payload["items"])
-
+    assert "27-inch Monitor" in {item["name"] for item in payload["items"]}
 
-def test_bulk_status_update(client, manager_headers):
-    listing = client.get("/api/items", headers=manager_headers)
-    assert listing.status_code == 200
-    item_ids = [row["id"] for row in listing.json()["items"][:2]]
 
-    result = client.patch(
-        "/api/items/status/bulk",
-        headers=manager_headers,
-        json={"item_ids": item_ids, "status": "ordered", "note": "bulk test"},
+def test_bulk_status_update(client, manager_headers, db_connection):
+    # A full request's worth of ids (BulkStatusUpdateRequest allows 300), inserted in one statement.
+    db_connection.execute(
+        insert(Item),
+        [
+            {"sku": f"BULK-{index:03d}", "name": f"Bulk {index}", "category": "Testing", "status": ItemStatus.IN_STOCK}
+            for index in range(300)
+        ],
     )
+    item_ids = list(db_connection.scalars(select(Item.id).where(Item.sku.like("BULK-%"))))
+
+    statements: list[str] = []
+
+    def record(_conn, _cursor, statement, _parameters, _context, _executemany) -> None:
+        statements.append(statement.lstrip().upper())
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        result = client.patch(
+            "/api/items/status/bulk",
+            headers=manager_headers,
+            json={"item_ids": item_ids, "status": "ordered", "note": "bulk test"},
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
     assert result.status_code == 200
     assert result.json()["updated_count"] == len(item_ids)
+    assert sum(statement.startswith("UPDATE ITEMS") for statement in statements) == 1
+    assert sum(statement.startswith("INSERT INTO AUDIT_LOGS") for statement in statements) == 1
+
+
+@pytest.mark.parametrize("force_fail", [False, True])
+def test_ai_endpoints_have_graceful_source(client, viewer_headers, monkeypatch, force_fail):
+    # A canned model reply covering every AI route's keys, or a failing call for the fallback chain.
+    def create(**_kwargs):
+        if force_fail:
+            raise RuntimeError("model unavailable")
+        return SimpleNamespace(
+            output_text=json.dumps({"reasons": {}, "notes": {}, "q": "", "status": "low_stock", "max_qty": 20})
+        )
+
+    fake_client = SimpleNamespace(responses=SimpleNamespace(create=create))
+    monkeypatch.setattr(ai_features, "_get_openai_client", lambda: (fake_client, "test-model"))
+    monkeypatch.setenv("AI_MIN_ITEMS", "1")
+    monkeypatch.setenv("OPENAI_MAX_RETRIES", "0")
+    ai_features._REORDER_REASON_CACHE.clear()
+    ai_features._NL_FILTER_CACHE.clear()
+    expected = "fallback" if force_fail else "ai"
 
-
-def test_ai_endpoints_have_graceful_source(client, viewer_headers):
     reorder = client.get("/api/ai/reorder-suggestions", headers=viewer_headers)
     assert reorder.status_code == 200
-    assert reorder.json()["source"] in {"ai", "fallback"}
+    assert reorder.json()["source"] == expected
+    assert reorder.json()["suggestions"]
 
     anomaly = client.get("/api/ai/anomaly-alerts", headers=viewer_headers)
     assert anomaly.status_code == 200
-    assert anomaly.json()["source"] in {"ai", "fallback"}
+    assert anomaly.json()["source"] == expected
+
+    insights = client.get("/api/ai/insights", headers=viewer_headers)
+    assert insights.status_code == 200
+    assert insights.json()["reorder"]["source"] == expected
+    assert insights.json()["anomalies"]["source"] == expected
 
     nl = client.post(
         "/api/ai/natural-language-search",
@@ -110,26 +167,13 @@ def test_ai_endpoints_have_graceful_source(client, viewer_headers):
         json={"query": "low stock electronics under 20"},
     )
     assert nl.status_code == 200
-    assert nl.json()["source"] in {"ai", "fallback"}
+    assert nl.json()["source"] == expected
+    assert nl.json()["parsed_filters"]["status"] == "low_stock"
+    assert nl.json()["parsed_filters"]["max_qty"] == 20
 
 
-def test_deleted_item_cannot_be_edited(client, manager_headers):
-    created = client.post(
-        "/api/items",
-        headers=manager_headers,
-        json={
-            "sku": "TEST-DEL-EDIT-1",
-            "name": "Delete Edit Guard",
-            "category": "Testing",
-            "details": "guard check",
-            "quantity": 5,
-            "reorder_threshold": 2,
-            "unit_cost": 2.5,
-            "status": "in_stock",
-        },
-    )
-    assert created.status_code == 200
-    item_id = created.json()["id"]
+def test_deleted_item_cannot_be_edited(client, manager_headers, make_item):
+    item_id = make_item("TEST-DEL-EDIT-1", quantity=5, reorder_threshold=2, unit_cost=2.5)
 
     deleted = client.delete(f"/api/items/{item_id}", headers=manager_headers)
     assert deleted.status_code == 200
@@ -143,23 +187,8 @@ def test_deleted_item_cannot_be_edited(client, manager_headers):
     assert "Cannot edit a deleted item" in update_attempt.json()["detail"]
 
 
-def test_restore_item_via_single_and_bulk_status(client, manager_headers):
-    created = client.post(
-        "/api/items",
-        headers=manager_headers,
-        json={
-            "sku": "TEST-RESTORE-1",
-            "name": "Restore Path",
-            "category": "Testing",
-            "details": "restore checks",
-            "quantity": 3,
-            "reorder_threshold": 1,
-            "unit_cost": 4.0,
-            "status": "in_stock",
-        },
-    )
-    assert created.status_code == 200
-    item_id = created.json()["id"]
+def test_restore_item_via_single_and_bulk_status(client, manager_headers, make_item):
+    item_id = make_item("TEST-RESTORE-1", quantity=3, reorder_threshold=1, unit_cost=4.0)
 
     deleted = client.delete(f"/api/items/{item_id}", headers=manager_headers)
     assert deleted.status_code == 200
@@ -196,49 +225,248 @@ def test_restore_item_via_single_and_bulk_status(client, manager_headers):
     assert item_after_bulk.json()["status"] == "ordered"
 
 
-def test_create_with_discontinued_status_sets_deleted_flag(client, manager_headers):
-    created = client.post(
-        "/api/items",
+def _discontinue_item(client, headers, make_item, mutation):
+    # Each write path that can set status; returns the affected item id and the response.
+    if mutation == "post":
+        response = client.post(
+            "/api/items",
+            headers=headers,
+            json={
+                "sku": "TEST-DISC-POST-1",
+                "name": "Discontinued On Create",
+                "category": "Testing",
+                "quantity": 0,
+                "reorder_threshold": 0,
+                "unit_cost": 0.5,
+                "status": "discontinued",
+            },
+        )
+        return response.json().get("id"), response
+
+    item_id = make_item(f"TEST-DISC-{mutation.upper()}-1", quantity=3, reorder_threshold=1, unit_cost=1.5)
+    if mutation == "put":
+        response = client.put(f"/api/items/{item_id}", headers=headers, json={"status": "discontinued"})
+    elif mutation == "patch_single":
+        response = client.patch(f"/api/items/{item_id}/status", headers=headers, json={"status": "discontinued"})
+    else:
+        response = client.patch(
+            "/api/items/status/bulk", headers=headers, json={"item_ids": [item_id], "status": "discontinued"}
+        )
+    return item_id, response
+
+
+@pytest.mark.parametrize("mutation", ["post", "put", "patch_single", "patch_bulk"])
+def test_discontinued_status_sets_deleted_flag(client, manager_headers, make_item, db_connection, mutation):
+    item_id, response = _discontinue_item(client, manager_headers, make_item, mutation)
+    assert response.status_code == 200
+    if mutation != "patch_bulk":
+        assert response.json()["status"] == "discontinued"
+        assert response.json()["is_deleted"] is True
+
+    row = db_connection.execute(select(Item.status, Item.is_deleted).where(Item.id == item_id)).one()
+    assert tuple(row) == (ItemStatus.DISCONTINUED, True)
+
+
+def test_put_with_null_status_derives_status(client, manager_headers, make_item):
+    ordered_id = make_item("TEST-NULL-STATUS-1", quantity=2, reorder_threshold=5, status=ItemStatus.ORDERED)
+    renamed = client.put(f"/api/items/{ordered_id}", headers=manager_headers, json={"status": None, "name": "x1"})
+    assert renamed.status_code == 200
+    assert renamed.json()["name"] == "x1"
+    assert renamed.json()["status"] == "ordered"
+
+    stocked_id = make_item("TEST-NULL-STATUS-2", quantity=10, reorder_threshold=5)
+    drained = client.put(f"/api/items/{stocked_id}", headers=manager_headers, json={"status": None, "quantity": 3})
+    assert drained.status_code == 200
+    assert drained.json()["quantity"] == 3
+    assert drained.json()["status"] == "low_stock"
+
+
+def test_item_edits_rederive_a_stale_status(client, manager_headers, make_item):
+    # Stored before the status followed stock levels: in_stock although below its threshold.
+    stale_id = make_item("TEST-STALE-STATUS-1", quantity=2, reorder_threshold=5, status=ItemStatus.IN_STOCK)
+    renamed = client.put(f"/api/items/{stale_id}", headers=manager_headers, json={"name": "Stale status"})
+    assert renamed.status_code == 200
+    assert renamed.json()["status"] == "low_stock"
+
+    # An explicit status wins even when it equals the stored one.
+    pinned_id = make_item("TEST-STALE-STATUS-2", quantity=2, reorder_threshold=5, status=ItemStatus.IN_STOCK)
+    pinned = client.patch(f"/api/items/{pinned_id}/status", headers=manager_headers, json={"status": "in_stock"})
+    assert pinned.status_code == 200
+    assert pinned.json()["status"] == "in_stock"
+
+
+def test_item_timestamps_are_utc_in_write_and_read_responses(client, manager_headers):
+    item_id = client.get("/api/items", headers=manager_headers).json()["items"][0]["id"]
+    updated = client.put(f"/api/items/{item_id}", headers=manager_headers, json={"name": "Timestamp check"})
+    assert updated.status_code == 200
+    fetched = client.get(f"/api/items/{item_id}", headers=manager_headers).json()
+
+    for body in (updated.json(), fetched):
+        for field in ("created_at", "updated_at"):
+            assert datetime.fromisoformat(body[field]).utcoffset() == timedelta(0)
+    assert datetime.fromisoformat(fetched["updated_at"]) == datetime.fromisoformat(updated.json()["updated_at"])
+
+
+def test_list_items_total_is_reported_past_last_page(client, viewer_headers):
+    first_page = client.get("/api/items", headers=viewer_headers, params={"page_size": 5})
+    assert first_page.status_code == 200
+    total = first_page.json()["total"]
+    assert total > 5
+
+    past_end = client.get("/api/items", headers=viewer_headers, params={"page": 50, "page_size": 5})
+    assert past_end.status_code == 200
+    assert past_end.json()["items"] == []
+    assert past_end.json()["total"] == total
+
+
+def test_bulk_status_update_writes_one_audit_row_per_item(client, manager_headers):
+    item_ids = [row["id"] for row in client.get("/api/items", headers=manager_headers).json()["items"][:3]]
+
+    result = client.patch(
+        "/api/items/status/bulk",
         headers=manager_headers,
-        json={
-            "sku": "TEST-DISC-CREATE-1",
-            "name": "Discontinued On Create",
-            "category": "Testing",
-            "details": "create consistency",
-            "quantity": 0,
-            "reorder_threshold": 0,
-            "unit_cost": 0.5,
-            "status": "discontinued",
-        },
+        json={"item_ids": item_ids, "status": "ordered", "note": "bulk audit"},
     )
-    assert created.status_code == 200
-    assert created.json()["status"] == "discontinued"
-    assert created.json()["is_deleted"] is True
+    assert result.status_code == 200
+
+    logs = client.get("/api/audit", headers=manager_headers).json()
+    bulk_logs = [log for log in logs if log["action"] == "ITEM_STATUS_BULK_UPDATE"]
+    assert sorted(log["entity_id"] for log in bulk_logs) == sorted(item_ids)
+    for log in bulk_logs:
+        assert log["note"] == "bulk audit"
+        assert log["created_at"]
+        assert json.loads(log["after_state"])["status"] == "ordered"
+
+
+def _assert_dashboard_matches_items(client, headers):
+    items = client.get("/api/items", headers=headers, params={"page_size": 200}).json()["items"]
+    dashboard = client.get("/api/dashboard", headers=headers)
+    assert dashboard.status_code == 200
+    summary = dashboard.json()
+
+    assert summary["active_items"] == len(items)
+    assert summary["total_quantity"] == sum(item["quantity"] for item in items)
+    assert summary["total_inventory_value"] == round(sum(item["quantity"] * item["unit_cost"] for item in items), 2)
+    assert summary["low_stock_alerts"] == sum(
+        1
+        for item in items
+        if item["status"] in {"low_stock", "ordered"} or item["quantity"] <= item["reorder_threshold"]
+    )
+    assert summary["total_items"] > summary["active_items"]
 
 
-def test_put_with_discontinued_status_marks_deleted_flag(client, manager_headers):
+def test_dashboard_totals_match_active_items(client, viewer_headers):
+    _assert_dashboard_matches_items(client, viewer_headers)
+
+
+@pytest.mark.parametrize("counter_triggers", [True, False], ids=["triggers", "aggregate"])
+def test_dashboard_totals_follow_item_writes(client, manager_headers, monkeypatch, counter_triggers):
+    # Dialects without counter triggers compute the same totals from items instead.
+    monkeypatch.setattr(main, "inventory_totals_maintained", lambda _dialect: counter_triggers)
     created = client.post(
         "/api/items",
         headers=manager_headers,
         json={
-            "sku": "TEST-DISC-PUT-1",
-            "name": "Discontinued Via Put",
+            "sku": "TEST-TOTALS-1",
+            "name": "Totals Item",
             "category": "Testing",
-            "details": "put consistency",
-            "quantity": 3,
-            "reorder_threshold": 1,
-            "unit_cost": 1.5,
-            "status": "in_stock",
+            "quantity": 12,
+            "reorder_threshold": 5,
+            "unit_cost": 3.5,
         },
     )
     assert created.status_code == 200
     item_id = created.json()["id"]
+    _assert_dashboard_matches_items(client, manager_headers)
 
-    updated = client.put(
-        f"/api/items/{item_id}",
+    adjusted = client.post(
+        f"/api/items/{item_id}/quantity",
         headers=manager_headers,
-        json={"status": "discontinued"},
+        json={"event_type": "outbound", "quantity_delta": -9},
     )
-    assert updated.status_code == 200
-    assert updated.json()["status"] == "discontinued"
-    assert updated.json()["is_deleted"] is True
+    assert adjusted.status_code == 200
+    _assert_dashboard_matches_items(client, manager_headers)
+
+    listing = client.get("/api/items", headers=manager_headers).json()["items"]
+    bulk = client.patch(
+        "/api/items/status/bulk",
+        headers=manager_headers,
+        json={"item_ids": [row["id"] for row in listing[:3]], "status": "ordered"},
+    )
+    assert bulk.status_code == 200
+    _assert_dashboard_matches_items(client, manager_headers)
+
+    deleted = client.delete(f"/api/items/{item_id}", headers=manager_headers)
+    assert deleted.status_code == 200
+    _assert_dashboard_matches_items(client, manager_headers)
+
+
+def test_dashboard_without_counter_row_reads_items(client, viewer_headers, db_connection):
+    db_connection.execute(delete(InventoryTotals))
+    statements: list[str] = []
+
+    def record(_conn, _cursor, statement, _parameters, _context, _executemany) -> None:
+        statements.append(statement.lstrip().upper())
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        _assert_dashboard_matches_items(client, viewer_headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    # A read falls back to the aggregate; it never recreates the row or its triggers.
+    assert all(statement.startswith(("SELECT", "SAVEPOINT", "RELEASE", "ROLLBACK")) for statement in statements)
+
+
+def test_search_index_follows_item_edits(client, manager_headers):
+    listing = client.get("/api/items", headers=manager_headers, params={"q": "Monitor"})
+    assert listing.status_code == 200
+    item = next(row for row in listing.json()["items"] if row["name"] == "27-inch Monitor")
+
+    renamed = client.put(
+        f"/api/items/{item['id']}",
+        headers=manager_headers,
+        json={"name": "27-inch Display"},
+    )
+    assert renamed.status_code == 200
+
+    def search_ids(term: str) -> set[int]:
+        response = client.get("/api/items/search", headers=manager_headers, params={"q": term})
+        assert response.status_code == 200
+        return {row["id"] for row in response.json()["items"]}
+
+    assert item["id"] in search_ids("display")
+    assert item["id"] in search_ids("27")
+    assert item["id"] not in search_ids("27-inch Monitor")
+
+
+def test_duplicate_sku_is_rejected_on_create_and_update(client, manager_headers):
+    listing = client.get("/api/items", headers=manager_headers, params={"sort_by": "sku", "sort_dir": "asc"})
+    first, second = listing.json()["items"][:2]
+
+    created = client.post(
+        "/api/items",
+        headers=manager_headers,
+        json={"sku": first["sku"], "name": "Duplicate", "category": "Testing"},
+    )
+    assert created.status_code == 409
+    assert created.json()["detail"] == f"SKU already exists: {first['sku']}"
+
+    updated = client.put(f"/api/items/{second['id']}", headers=manager_headers, json={"sku": first["sku"]})
+    assert updated.status_code == 409
+
+    unchanged = client.get(f"/api/items/{second['id']}", headers=manager_headers)
+    assert unchanged.json()["sku"] == second["sku"]
+
+
+def test_enum_columns_store_plain_values(client, viewer_headers, db_connection):
+    statuses = set(db_connection.scalars(text("SELECT DISTINCT status FROM items")))
+    roles = set(db_connection.scalars(text("SELECT DISTINCT role FROM users")))
+
+    assert statuses == {"in_stock", "low_stock", "ordered", "discontinued"}
+    assert roles == {"admin", "manager", "viewer"}
+
+    response = client.get("/api/items", headers=viewer_headers, params={"status": "low_stock"})
+    assert response.status_code == 200
+    assert response.json()["total"] >= 1
+    assert {item["status"] for item in response.json()["items"]} == {"low_stock"}
@@ -1,5 +1,4 @@
 import hashlib
-import hmac
 
 from app.auth import hash_password, verify_password
 
@@ -11,7 +10,22 @@ def test_hash_password_uses_pbkdf2_format() -> None:
     assert not verify_password("wrong", hashed)
 
 
+def test_hash_password_supports_pbkdf2_sha512_scheme(monkeypatch) -> None:
+    monkeypatch.setenv("AUTH_PASSWORD_SCHEME", "pbkdf2_sha512")
+    hashed = hash_password("manager123")
+    assert hashed.startswith("pbkdf2_sha512$")
+    assert len(hashed) <= 128
+    assert verify_password("manager123", hashed)
+    assert not verify_password("wrong", hashed)
+
+
 def test_verify_password_supports_legacy_hash() -> None:
     legacy = hashlib.sha256("test-pepper:admin123".encode("utf-8")).hexdigest()
-    assert hmac.compare_digest(legacy, legacy)
     assert verify_password("admin123", legacy)
+    assert not verify_password("wrong", legacy)
+
+
+def test_verify_password_rejects_malformed_hashes() -> None:
+    assert not verify_password("admin123", "pbkdf2_sha256$not-a-number$00$00")
+    assert not verify_password("admin123", "pbkdf2_sha256$only$three")
+    assert not verify_password("admin123", "contraseña-no-hash")
@@ -1,4 +1,22 @@
-from app.services.ai_features import parse_natural_language_filters
+from datetime import date, datetime, time, timedelta, timezone
+import threading
+from types import SimpleNamespace
+
+import httpx
+import numpy as np
+import openai
+import pandas as pd
+import pytest
+
+from app.services import ai_features
+from app.models import ItemStatus, QuantityEventType
+from app.services.ai_features import build_ai_insights, parse_natural_language_filters
+from app.services.forecasting import (
+    FEATURE_FRAME_COLUMNS,
+    _build_feature_frame,
+    demand_series_from_transactions,
+    generate_forecast,
+)
 
 
 def test_natural_language_fallback_parses_status_and_qty() -> None:
@@ -6,3 +24,179 @@ def test_natural_language_fallback_parses_status_and_qty() -> None:
     assert parsed["status"] in {"low_stock", None}
     assert parsed["max_qty"] in {20, None}
     assert parsed["source"] in {"ai", "fallback"}
+
+
+def test_natural_language_ai_results_are_cached(monkeypatch) -> None:
+    calls: list[object] = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        return SimpleNamespace(output_text='{"q": "", "status": "low_stock", "max_qty": 10}')
+
+    client = SimpleNamespace(responses=SimpleNamespace(create=create))
+    monkeypatch.setattr(ai_features, "_get_openai_client", lambda: (client, "test-model"))
+    ai_features._NL_FILTER_CACHE.clear()
+
+    first = parse_natural_language_filters("low stock under 10")
+    first["status"] = "mutated"
+    second = parse_natural_language_filters("  low stock under 10 ")
+
+    assert len(calls) == 1
+    assert calls[0]["text"]["format"]["type"] == "json_schema"
+    assert second["source"] == "ai"
+    assert second["status"] == "low_stock"
+    assert second["max_qty"] == 10
+
+
+def test_ai_insights_annotate_both_panels_with_one_call(monkeypatch) -> None:
+    calls: list[object] = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        return SimpleNamespace(
+            output_text=(
+                '{"reasons": {"1": "Reorder before the weekend"}, '
+                '"notes": {"1": {"explanation": "Bulk pick", "action": "Recount"}}}'
+            )
+        )
+
+    client = SimpleNamespace(responses=SimpleNamespace(create=create))
+    monkeypatch.setattr(ai_features, "_get_openai_client", lambda: (client, "test-model"))
+    monkeypatch.setenv("AI_MIN_ITEMS", "1")
+    ai_features._REORDER_REASON_CACHE.clear()
+
+    item = SimpleNamespace(
+        id=1,
+        sku="SKU-1",
+        name="Widget",
+        status=ItemStatus.LOW_STOCK,
+        quantity=2,
+        reorder_threshold=10,
+        is_deleted=False,
+    )
+    event = SimpleNamespace(
+        item_id=1,
+        quantity_delta=-50,
+        event_type=QuantityEventType.OUTBOUND,
+        created_at=datetime(2026, 1, 5, tzinfo=timezone.utc),
+    )
+
+    result = build_ai_insights([item], [event], item_index={1: item})
+
+    assert len(calls) == 1
+    assert calls[0]["text"]["format"]["type"] == "json_object"
+    assert result["reorder"]["source"] == "ai"
+    assert result["reorder"]["suggestions"][0]["reason"] == "Reorder before the weekend"
+    assert result["anomalies"]["alerts"][0]["explanation"] == "Bulk pick"
+    assert result["anomalies"]["alerts"][0]["suggested_action"] == "Recount"
+
+
+def test_transient_openai_errors_are_retried(monkeypatch) -> None:
+    sleeps: list[float] = []
+    attempts: list[int] = []
+    request = httpx.Request("POST", "https://api.openai.com/v1/responses")
+
+    def create(**kwargs):
+        attempts.append(1)
+        if len(attempts) == 1:
+            response = httpx.Response(429, request=request, headers={"retry-after": "1.5"})
+            raise openai.RateLimitError("rate limited", response=response, body=None)
+        return SimpleNamespace(output_text="{}")
+
+    client = SimpleNamespace(responses=SimpleNamespace(create=create))
+    monkeypatch.setattr(ai_features.time, "sleep", sleeps.append)
+
+    ai_features._create_response(client, model="test-model")
+
+    assert len(attempts) == 2
+    assert sleeps == [1.5]
+
+
+def test_trivial_or_saturated_ai_requests_use_fallback(monkeypatch) -> None:
+    calls: list[object] = []
+    client = SimpleNamespace(responses=SimpleNamespace(create=lambda **kwargs: calls.append(kwargs)))
+    monkeypatch.setattr(ai_features, "_get_openai_client", lambda: (client, "test-model"))
+    ai_features._REORDER_REASON_CACHE.clear()
+    items = [
+        SimpleNamespace(
+            id=index,
+            sku=f"SKU-{index}",
+            name="Widget",
+            status=ItemStatus.LOW_STOCK,
+            quantity=1,
+            reorder_threshold=5,
+            is_deleted=False,
+        )
+        for index in range(1, 3)
+    ]
+
+    monkeypatch.setenv("AI_MIN_ITEMS", "3")
+    assert ai_features.build_reorder_suggestions(items)["source"] == "fallback"
+
+    monkeypatch.setenv("AI_MIN_ITEMS", "1")
+    monkeypatch.setattr(ai_features, "_OPENAI_INFLIGHT", threading.BoundedSemaphore(1))
+    monkeypatch.setattr(ai_features, "_OPENAI_INFLIGHT_WAIT_SECONDS", 0.01)
+    ai_features._OPENAI_INFLIGHT.acquire()
+    assert ai_features.build_reorder_suggestions(items)["source"] == "fallback"
+
+    assert calls == []
+
+
+def _transaction(days_ago: int, transaction_type: str, quantity_delta: int) -> SimpleNamespace:
+    created_at = datetime.combine(date.today() - timedelta(days=days_ago), time(12))
+    return SimpleNamespace(transaction_type=transaction_type, quantity_delta=quantity_delta, created_at=created_at)
+
+
+def _weekly_demand(days: int) -> pd.Series:
+    index = pd.date_range(end=pd.Timestamp.today().normalize(), periods=days, freq="D")
+    return pd.Series(10.0 + 5.0 * (index.dayofweek >= 5), index=index, name="demand")
+
+
+def test_demand_series_sums_outbound_quantities_per_day() -> None:
+    series = demand_series_from_transactions(
+        [
+            _transaction(3, "OUTBOUND", -5),
+            _transaction(3, "outbound", -3),
+            _transaction(2, "INBOUND", 20),
+            _transaction(2, "ADJUSTMENT", -4),
+            _transaction(1, "OUTBOUND", -2),
+        ]
+    )
+
+    assert list(series.index.date) == [date.today() - timedelta(days=days_ago) for days_ago in (3, 2, 1, 0)]
+    assert series.tolist() == [8.0, 0.0, 2.0, 0.0]
+
+
+def test_feature_frame_lags_the_series() -> None:
+    series = _weekly_demand(40)
+    series.iloc[:] = np.arange(40, dtype=float)
+
+    model_ready, frame = _build_feature_frame(series)
+
+    assert model_ready
+    assert list(frame.columns) == FEATURE_FRAME_COLUMNS
+    assert frame.shape == (12, len(FEATURE_FRAME_COLUMNS))
+    first = frame.iloc[0]
+    assert first["y"] == 28.0
+    assert [first[f"lag_{lag}"] for lag in (1, 7, 28)] == [27.0, 21.0, 0.0]
+    assert first["rolling_mean_7"] == 24.0
+    assert first["trend"] == 28.0
+    assert first["dow"] == series.index[28].dayofweek
+
+
+@pytest.mark.parametrize(
+    ("allow_ml", "method"),
+    [(True, "gradient-boosted-lag-model"), (False, "weighted-moving-average")],
+)
+def test_generate_forecast_covers_the_horizon(allow_ml: bool, method: str) -> None:
+    series = _weekly_demand(150)
+
+    result = generate_forecast(series, horizon_days=14, allow_ml=allow_ml)
+
+    assert result.method == method
+    assert (result.holdout_wape is not None) == allow_ml
+    assert [row["date"] for row in result.forecast] == [
+        (series.index[-1] + timedelta(days=step)).date() for step in range(1, 15)
+    ]
+    assert all(0.0 <= row["p10"] <= row["p50"] <= row["p90"] for row in result.forecast)
+    assert len(result.history) == 90
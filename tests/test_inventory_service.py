@@ -1,15 +1,54 @@
-from app.models import Item, ItemStatus
-from app.main import _derive_stock_status
-
-
-def test_status_derivation_low_stock() -> None:
-    item = Item(
-        sku="TEST",
-        name="Test",
-        category="Category",
-        quantity=2,
-        reorder_threshold=5,
-        unit_cost=1.0,
-        status=ItemStatus.IN_STOCK,
+import numpy as np
+import pytest
+
+from app.models import ItemStatus, derive_stock_status
+from app.services.inventory import calculate_reorder_policy, calculate_reorder_policy_batch
+
+
+@pytest.mark.parametrize(
+    ("status", "quantity", "reorder_threshold", "expected"),
+    [
+        (ItemStatus.IN_STOCK, 2, 5, ItemStatus.LOW_STOCK),
+        (ItemStatus.IN_STOCK, 5, 5, ItemStatus.LOW_STOCK),
+        (ItemStatus.IN_STOCK, 6, 5, ItemStatus.IN_STOCK),
+        (ItemStatus.LOW_STOCK, 9, 5, ItemStatus.IN_STOCK),
+        (ItemStatus.DISCONTINUED, 0, 5, ItemStatus.DISCONTINUED),
+        (None, 2, 5, ItemStatus.LOW_STOCK),
+    ],
+)
+def test_status_derivation_low_stock(status, quantity, reorder_threshold, expected) -> None:
+    assert derive_stock_status(status, quantity=quantity, reorder_threshold=reorder_threshold) == expected
+
+
+def test_status_derivation_keeps_ordered_until_restocked() -> None:
+    assert derive_stock_status(ItemStatus.ORDERED, quantity=2, reorder_threshold=5) == ItemStatus.ORDERED
+    assert derive_stock_status(ItemStatus.ORDERED, quantity=9, reorder_threshold=5) == ItemStatus.IN_STOCK
+    assert (
+        derive_stock_status(ItemStatus.ORDERED, quantity=2, reorder_threshold=5, keep_ordered=False)
+        == ItemStatus.LOW_STOCK
     )
-    assert _derive_stock_status(item) == ItemStatus.LOW_STOCK
+
+
+def test_reorder_policy_batch_matches_scalar_policy() -> None:
+    on_hand = np.array([0, 4, 40, 120, 9])
+    lead_time = np.array([7, 0, 14, 3, 5])
+    p50 = np.array([2.5, 1.0, 3.2, 0.0, 1.75])
+    std = np.array([1.0, 0.5, 2.0, 0.0, 0.8])
+    min_order_qty = np.array([0, 10, 25, 5, 12])
+    override = np.array([np.nan, 20.0, np.nan, 1.0, np.nan])
+
+    batch = calculate_reorder_policy_batch(
+        on_hand, lead_time, 0.95, p50, std, min_order_qty=min_order_qty, safety_stock_override=override
+    )
+
+    for index in range(len(on_hand)):
+        scalar = calculate_reorder_policy(
+            int(on_hand[index]),
+            int(lead_time[index]),
+            0.95,
+            float(p50[index]),
+            float(std[index]),
+            min_order_qty=int(min_order_qty[index]),
+            safety_stock_override=None if np.isnan(override[index]) else int(override[index]),
+        )
+        assert {key: values[index].item() for key, values in batch.items()} == scalar